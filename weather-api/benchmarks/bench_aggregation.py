@@ -0,0 +1,109 @@
+"""
+Benchmark of the aggregation of provider results.
+
+Compares the former per-city loop over Python lists with the
+AggregationEngine, through its scalar per-city path and its vectorized
+NumPy path, at several batch sizes. The engine switches to NumPy from
+AGGREGATION_BATCH_MIN_CITIES cities: pick it where the NumPy path wins.
+
+Usage:
+    python -m benchmarks.bench_aggregation [--cities 1 10 200 1000 5000] [--repeat 5]
+"""
+import argparse
+import random
+import time
+
+from src.services.aggregation import AggregationEngine
+from src.services.observation import ProviderObservation, wind_speed_ms
+
+def make_results(rng: random.Random):
+    """Build the results of the three providers for one city"""
+    return [
+        {
+            "source": "open_meteo",
+            "temperature": {"current": rng.uniform(-10, 35), "unit": "celsius"},
+            "humidity": rng.uniform(20, 100),
+            "wind": {"speed": rng.uniform(0, 60), "direction": rng.uniform(0, 360), "unit": "km/h"},
+            "conditions": {"main": "Clouds", "description": "Overcast"},
+        },
+        {
+            "source": "openweather",
+            "temperature": {"current": rng.uniform(-10, 35), "unit": "celsius"},
+            "humidity": rng.uniform(20, 100),
+            "pressure": rng.uniform(980, 1040),
+            "wind": {"speed": rng.uniform(0, 15), "direction": rng.uniform(0, 360), "unit": "m/s"},
+            "conditions": {"main": "Clouds", "description": "Broken clouds"},
+        },
+        {
+            "source": "weatherapi",
+            "temperature": {"current": rng.uniform(-10, 35), "unit": "celsius"},
+            "humidity": rng.uniform(20, 100),
+            "pressure": rng.uniform(980, 1040),
+            "wind": {"speed": rng.uniform(0, 60), "direction": rng.uniform(0, 360), "unit": "km/h"},
+            "conditions": {"main": "Cloudy", "description": "Cloudy"},
+        },
+    ]
+
+def to_observation(result):
+    """Normalize a provider result dict as the adapters do"""
+    wind = result.get("wind") or {}
+    conditions = result.get("conditions") or {}
+    return ProviderObservation(
+        source=result["source"],
+        temperature=result["temperature"]["current"],
+        humidity=result.get("humidity"),
+        pressure=result.get("pressure"),
+        wind_speed=wind_speed_ms(wind.get("speed"), wind.get("unit", "m/s")),
+        wind_direction=wind.get("direction"),
+        condition=conditions.get("main"),
+        description=conditions.get("description"),
+    )
+
+def legacy_aggregate(results):
+    """Per-city aggregation as done before the engine (no unit conversion)"""
+    temps = [r["temperature"]["current"] for r in results if "temperature" in r]
+    humidities = [r["humidity"] for r in results if "humidity" in r and r["humidity"] is not None]
+    wind_speeds = [r["wind"]["speed"] for r in results if "wind" in r and r["wind"] is not None]
+    return {
+        "temperature": sum(temps) / len(temps) if temps else None,
+        "humidity": sum(humidities) / len(humidities) if humidities else None,
+        "wind_speed": sum(wind_speeds) / len(wind_speeds) if wind_speeds else None,
+        "wind_direction": next((r["wind"]["direction"] for r in results if "wind" in r and "direction" in r["wind"]), None),
+        "conditions": next((r["conditions"] for r in results if "conditions" in r), None),
+        "sources": [r["source"] for r in results],
+    }
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, nargs="+", default=[1, 10, 200, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scalar = AggregationEngine(batch_min_cities=10 ** 9)
+    vectorized = AggregationEngine(batch_min_cities=1)
+    rng = random.Random(42)
+    for cities in args.cities:
+        results_by_city = [make_results(rng) for _ in range(cities)]
+        observations_by_city = [[to_observation(r) for r in results] for results in results_by_city]
+        columns = vectorized.to_columns(observations_by_city)
+        timings = [
+            ("legacy per-city loop", best_of(args.repeat, lambda: [legacy_aggregate(results) for results in results_by_city])),
+            ("engine, scalar path", best_of(args.repeat, lambda: scalar.aggregate_results(observations_by_city))),
+            ("engine, NumPy path", best_of(args.repeat, lambda: vectorized.aggregate_results(observations_by_city))),
+            ("NumPy kernel only", best_of(args.repeat, lambda: vectorized.aggregate(columns))),
+        ]
+
+        print(f"{cities} cities x 3 sources (best of {args.repeat})")
+        for name, seconds in timings:
+            print(f"  {name:<24} {seconds * 1000:9.3f} ms  {cities / seconds:12,.0f} cities/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark of response compression.
+
+Measures, for typical weather payloads, the size saved and the CPU cost of
+gzip and brotli, and the cost of serving a hot response from the
+compressed body cache instead of compressing it again.
+
+Usage:
+    python -m benchmarks.bench_compression [--repeat 200]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from src.middleware.compression import CompressedBodyCache, brotli, compress
+from src.schemas.weather import CurrentWeather, Forecast, HistoricalWeather, ForecastItem, Temperature, Wind, WeatherCondition
+
+def make_items(count):
+    return [
+        ForecastItem(
+            timestamp=datetime(2024, 1, 1) + timedelta(days=i),
+            temperature=Temperature(current=20.0 + i / 3, min=15.0, max=25.0, unit="celsius"),
+            humidity=60.0 + i % 10,
+            pressure=1013.0,
+            wind=Wind(speed=3.5, direction=120.0, unit="m/s"),
+            conditions=WeatherCondition(main="Clouds", description="Scattered clouds"),
+        )
+        for i in range(count)
+    ]
+
+def make_payloads():
+    coords = {"lat": 48.8566, "lon": 2.3522}
+    return {
+        "current": CurrentWeather(
+            city="Paris", coordinates=coords, temperature=Temperature(current=20.0),
+            humidity=60.0, wind=Wind(speed=3.0, direction=90.0),
+            conditions=WeatherCondition(main="Clear", description="Clear sky"),
+            sources=["open_meteo", "openweather", "weatherapi"],
+        ).model_dump_json().encode(),
+        "forecast (10 days)": Forecast(
+            city="Paris", coordinates=coords, forecast_items=make_items(10), sources=["open_meteo"]
+        ).model_dump_json().encode(),
+        "history (30 days)": HistoricalWeather(
+            city="Paris", coordinates=coords, historical_data=make_items(30), sources=["open_meteo"]
+        ).model_dump_json().encode(),
+    }
+
+def mean_time(repeat, func):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    print(f"{'payload':<20} {'encoding':<8} {'raw':>8} {'sent':>8} {'saved':>7} {'compress':>12} {'cached hit':>12}")
+    for name, body in make_payloads().items():
+        for encoding in encodings:
+            compressed = compress(body, encoding)
+            cold = mean_time(args.repeat, lambda: compress(body, encoding))
+            cache = CompressedBodyCache(max_entries=16)
+            cache.get_or_compress(body, encoding)
+            hot = mean_time(args.repeat, lambda: cache.get_or_compress(body, encoding))
+            print(
+                f"{name:<20} {encoding:<8} {len(body):>7}B {len(compressed):>7}B "
+                f"{1 - len(compressed) / len(body):>6.0%} {cold * 1e6:>10.1f}us {hot * 1e6:>10.1f}us"
+            )
+
+if __name__ == "__main__":
+    main()
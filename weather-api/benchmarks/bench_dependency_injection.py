@@ -0,0 +1,108 @@
+"""
+Benchmark of the per-request cost of injecting the WeatherService.
+
+Compares the former `service: WeatherService = Depends()` (a new service
+built with its sub-dependencies and city map on every request) with the
+application-scoped container. The service call itself is stubbed so only
+routing, dependency resolution and allocations are measured.
+
+Usage:
+    python -m benchmarks.bench_dependency_injection [--requests 2000]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from config.settings import settings
+from src.services.container import get_weather_service
+from src.services.quota_service import QuotaManager
+from src.services.redis_service import RedisService, get_redis_service
+from src.services.weather_service import WeatherService
+
+async def get_quota_manager(redis_service: RedisService = Depends(get_redis_service)) -> QuotaManager:
+    return QuotaManager(redis_service)
+
+class PerRequestWeatherService(WeatherService):
+    """The service as it was injected before: built per request"""
+    def __init__(
+        self,
+        redis_service: RedisService = Depends(get_redis_service),
+        quota_manager: QuotaManager = Depends(get_quota_manager)
+    ):
+        super().__init__(redis_service, quota_manager)
+        self.open_meteo_base_url = settings.OPEN_METEO_BASE_URL
+        self.city_coordinates = {
+            "paris": {"lat": 48.8566, "lon": 2.3522},
+            "london": {"lat": 51.5074, "lon": -0.1278},
+            "new york": {"lat": 40.7128, "lon": -74.0060},
+            "tokyo": {"lat": 35.6762, "lon": 139.6503},
+            "sydney": {"lat": -33.8688, "lon": 151.2093},
+            "berlin": {"lat": 52.5200, "lon": 13.4050},
+            "madrid": {"lat": 40.4168, "lon": -3.7038},
+            "rome": {"lat": 41.9028, "lon": 12.4964},
+        }
+
+app = FastAPI()
+
+@app.get("/per-request/{city}")
+async def per_request(city: str, service: PerRequestWeatherService = Depends()):
+    return {"city": city}
+
+@app.get("/container/{city}")
+async def app_scoped(city: str, service: WeatherService = Depends(get_weather_service)):
+    return {"city": city}
+
+async def measure(client, path, count):
+    for _ in range(100):  # warm-up
+        await client.get(path)
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await client.get(path)
+    return (time.perf_counter() - start) / count
+
+def allocation_per_request(build, count=1000):
+    """Bytes allocated by the dependency of one request (instances kept alive to be counted)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [build() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return (after - before) / count
+
+def resolve(coroutine):
+    """Run a dependency coroutine that never awaits and return its value"""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+async def run(count):
+    redis_service = RedisService()
+    allocations = {
+        "per-request Depends()": allocation_per_request(
+            lambda: PerRequestWeatherService(redis_service, QuotaManager(redis_service))
+        ),
+        "app-scoped container": allocation_per_request(lambda: resolve(get_weather_service())),
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, path in [("per-request Depends()", "/per-request/paris"), ("app-scoped container", "/container/paris")]:
+            seconds = await measure(client, path, count)
+            print(f"  {name:<24} {seconds * 1e6:8.1f} us/request  {allocations[name]:8.0f} B allocated by the dependency")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    print(f"{args.requests} requests through the ASGI stack")
+    asyncio.run(run(args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark of the internal representation of provider results.
+
+Compares the nested dicts the adapters used to return with slotted
+ProviderObservation records: memory allocated to hold the results of
+many cities (tracemalloc) and time to lay them out as columns and
+aggregate them.
+
+Usage:
+    python -m benchmarks.bench_provider_records [--cities 10000] [--repeat 5]
+"""
+import argparse
+import random
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.bench_aggregation import best_of, make_results, to_observation
+from src.services.aggregation import AggregationEngine, FIELDS
+from src.services.observation import WIND_SPEED_TO_MS
+
+def dict_values(result):
+    """Numeric fields of a dict result, as the engine used to read them"""
+    temperature = result.get("temperature") or {}
+    wind = result.get("wind") or {}
+    wind_speed = wind.get("speed")
+    if wind_speed is not None:
+        wind_speed = wind_speed * WIND_SPEED_TO_MS.get(wind.get("unit", "m/s"), 1.0)
+    return [temperature.get("current"), result.get("humidity"), result.get("pressure"), wind_speed, wind.get("direction")]
+
+def dict_to_columns(engine, results_by_city):
+    """Former AggregationEngine.to_columns over dict results"""
+    sources = list(engine.source_weights)
+    index = {source: i for i, source in enumerate(sources)}
+    nan_row = [np.nan] * len(FIELDS)
+    rows = []
+    for results in results_by_city:
+        row = [nan_row] * len(sources)
+        for result in results:
+            row[index[result["source"]]] = [np.nan if v is None else v for v in dict_values(result)]
+        rows.append(row)
+    values = np.array(rows, dtype=float).reshape(len(results_by_city), len(sources), len(FIELDS)).transpose(2, 0, 1)
+    return {
+        "sources": sources,
+        "weights": np.array([engine.source_weights.get(s, 1.0) for s in sources]),
+        **{field: values[i] for i, field in enumerate(FIELDS)},
+    }
+
+def allocated(build):
+    """Bytes and blocks allocated by build() and still alive afterwards"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    del kept
+    return sum(s.size_diff for s in stats), sum(s.count_diff for s in stats)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = AggregationEngine()
+    dicts = [make_results(random.Random(i)) for i in range(args.cities)]
+    records = [[to_observation(r) for r in results] for results in dicts]
+
+    dict_bytes, dict_blocks = allocated(lambda: [make_results(random.Random(i)) for i in range(args.cities)])
+    record_bytes, record_blocks = allocated(
+        lambda: [[to_observation(r) for r in make_results(random.Random(i))] for i in range(args.cities)]
+    )
+
+    dict_time = best_of(args.repeat, lambda: engine.aggregate(dict_to_columns(engine, dicts)))
+    record_time = best_of(args.repeat, lambda: engine.aggregate(engine.to_columns(records)))
+
+    print(f"{args.cities} cities x 3 sources (best of {args.repeat})")
+    print(f"  {'':<20} {'memory':>12} {'blocks':>10} {'aggregate':>12}")
+    for name, size, blocks, seconds in [
+        ("nested dicts", dict_bytes, dict_blocks, dict_time),
+        ("slotted records", record_bytes, record_blocks, record_time),
+    ]:
+        print(f"  {name:<20} {size / 1e6:9.2f} MB {blocks:>10,} {seconds * 1000:9.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of the response formats.
+
+Compares JSON (as FastAPI renders a response model), JSON through
+orjson, MessagePack and CBOR: payload size and encoding time of a
+current weather document, a 10-day forecast and a 50-city batch.
+
+Usage:
+    python -m benchmarks.bench_serialization [--repeat 2000]
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.bench_aggregation import best_of
+from src.routers.responses import cbor2, msgpack
+from src.schemas.weather import CurrentWeather, Forecast, ForecastItem, Temperature, WeatherCondition, Wind
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def make_current(city: str) -> CurrentWeather:
+    return CurrentWeather(
+        city=city,
+        temperature=Temperature(current=21.4, feels_like=20.9, unit="celsius"),
+        conditions=WeatherCondition(main="Clouds", description="Partly cloudy"),
+        humidity=64,
+        pressure=1014.2,
+        wind=Wind(speed=4.2, direction=225.0, unit="m/s"),
+        sources=["openweather", "weatherapi", "open_meteo"],
+        timestamp=datetime(2024, 6, 1, 12, 0)
+    )
+
+def make_forecast(days: int) -> Forecast:
+    start = datetime(2024, 6, 1)
+    return Forecast(
+        city="Paris",
+        forecast_items=[
+            ForecastItem(
+                timestamp=start + timedelta(days=i),
+                temperature=Temperature(min=14.0 + i % 3, max=24.5 - i % 4, current=19.2, unit="celsius"),
+                conditions=WeatherCondition(main="Rain", description="Light rain"),
+                humidity=70 + i % 10,
+                wind=Wind(speed=3.1 + i / 10, direction=180.0, unit="m/s")
+            )
+            for i in range(days)
+        ],
+        sources=["openweather", "weatherapi", "open_meteo"]
+    )
+
+def encoders():
+    """(name, encode) pairs, encode taking a model or a list of models"""
+    def plain(result):
+        if isinstance(result, list):
+            return [item.model_dump(mode="json") for item in result]
+        return result.model_dump(mode="json")
+
+    yield "json (fastapi)", lambda result: json.dumps(jsonable_encoder(result)).encode()
+    if orjson is not None:
+        yield "orjson", lambda result: orjson.dumps(plain(result))
+    if msgpack is not None:
+        yield "msgpack", lambda result: msgpack.packb(plain(result))
+    if cbor2 is not None:
+        yield "cbor", lambda result: cbor2.dumps(plain(result))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    documents = [
+        ("current", make_current("Paris")),
+        ("forecast 10 days", make_forecast(10)),
+        ("batch 50 cities", [make_current(f"City {i}") for i in range(50)]),
+    ]
+    for label, document in documents:
+        print(f"{label} (best of 5 x {args.repeat})")
+        print(f"  {'':<16} {'bytes':>8} {'encode':>12}")
+        for name, encode in encoders():
+            size = len(encode(document))
+            seconds = best_of(5, lambda: [encode(document) for _ in range(args.repeat)]) / args.repeat
+            print(f"  {name:<16} {size:>8} {seconds * 1e6:>10.1f}us")
+
+if __name__ == "__main__":
+    main()
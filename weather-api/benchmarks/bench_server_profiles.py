@@ -0,0 +1,169 @@
+"""
+Benchmark of the server profiles on the cached current weather path.
+
+Starts the API with each profile, seeds the cache entry of one city and
+measures requests/s and latency percentiles of
+GET /api/v1/weather/current/{city} under concurrent keep-alive load:
+
+    asyncio + h11     uvicorn with the event loop and parser pinned to
+                      the pure Python ones and the access log on
+    production x1     python -m src.server --workers 1
+    production xN     python -m src.server (one worker per CPU),
+                      only when Redis is reachable since every worker
+                      must see the seeded entry
+
+Without Redis the entry is seeded in the local cache tier and REDIS_URL
+is cleared for the servers. The load generator runs in separate
+processes so it does not share a CPU budget with one server process.
+
+Usage:
+    python -m benchmarks.bench_server_profiles [--duration 10] [--connections 64] [--clients 2]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import numpy as np
+
+from config.settings import settings
+from src.schemas.weather import CurrentWeather, Temperature, WeatherCondition, Wind
+from src.server import cpu_count
+from src.services.field_selection import current_cache_key
+from src.services.local_cache import LocalCache
+
+CITY = "Paris"
+
+def cached_entry() -> str:
+    return CurrentWeather(
+        city=CITY,
+        temperature=Temperature(current=21.4, unit="celsius"),
+        conditions=WeatherCondition(main="Clouds", description="Partly cloudy"),
+        humidity=64,
+        pressure=1014.2,
+        wind=Wind(speed=4.2, direction=225.0, unit="m/s"),
+        sources=["open_meteo", "openweather", "weatherapi"]
+    ).model_dump_json()
+
+async def redis_reachable() -> bool:
+    if not settings.REDIS_URL:
+        return False
+    import redis.asyncio as redis
+    client = redis.from_url(settings.REDIS_URL)
+    try:
+        await client.ping()
+        return True
+    except Exception:
+        return False
+    finally:
+        await client.aclose()
+
+async def seed_redis():
+    import redis.asyncio as redis
+    client = redis.from_url(settings.REDIS_URL)
+    await client.set(current_cache_key(CITY), cached_entry(), ex=3600)
+    await client.aclose()
+
+def seed_local_cache(directory: str):
+    """Leave a cache file behind, merged by the next server at start"""
+    cache = LocalCache(directory=directory)
+    cache.set(current_cache_key(CITY), cached_entry(), ex=3600)
+    cache.close()
+
+def start_server(command, env, port) -> subprocess.Popen:
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/v1/health/live").status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"Server did not start: {' '.join(command)}")
+
+async def load(url: str, connections: int, duration: float, warmup: float):
+    """Latencies of the requests completed after the warmup, and their count of errors"""
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(limits=limits) as client:
+        start = time.perf_counter()
+        measure_from, stop_at = start + warmup, start + warmup + duration
+
+        async def worker():
+            nonlocal errors
+            while True:
+                sent = time.perf_counter()
+                if sent >= stop_at:
+                    return
+                response = await client.get(url)
+                done = time.perf_counter()
+                if sent >= measure_from:
+                    if response.status_code == 200:
+                        latencies.append(done - sent)
+                    else:
+                        errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(connections)))
+    return latencies, errors
+
+def run_client(url, connections, duration, warmup):
+    return asyncio.run(load(url, connections, duration, warmup))
+
+def measure(url, args):
+    per_client = max(1, args.connections // args.clients)
+    with ProcessPoolExecutor(args.clients) as pool:
+        runs = list(pool.map(run_client, *zip(*[(url, per_client, args.duration, args.warmup)] * args.clients)))
+    latencies = np.array([latency for run, _ in runs for latency in run])
+    errors = sum(errors for _, errors in runs)
+    return len(latencies) / args.duration, np.percentile(latencies, 50), np.percentile(latencies, 99), errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with_redis = asyncio.run(redis_reachable())
+    cache_dir = tempfile.mkdtemp(prefix="bench-server-")
+    env = {**os.environ, "LOCAL_CACHE_DIR": cache_dir}
+    if not with_redis:
+        env["REDIS_URL"] = ""
+        print("Redis not reachable: cache seeded locally, multi-worker profile skipped")
+
+    python = sys.executable
+    port = str(args.port)
+    profiles = [
+        ("asyncio + h11", [python, "-m", "uvicorn", "src.main:app", "--port", port, "--loop", "asyncio", "--http", "h11"]),
+        ("production x1", [python, "-m", "src.server", "--port", port, "--workers", "1"]),
+    ]
+    if with_redis:
+        profiles.append((f"production x{cpu_count()}", [python, "-m", "src.server", "--port", port]))
+
+    url = f"http://127.0.0.1:{port}/api/v1/weather/current/{CITY}"
+    print(f"GET {url}, {args.connections} connections, {args.duration}s")
+    print(f"  {'':<16} {'req/s':>10} {'p50':>10} {'p99':>10} {'errors':>8}")
+    for name, command in profiles:
+        if with_redis:
+            asyncio.run(seed_redis())
+        else:
+            seed_local_cache(cache_dir)
+        server = start_server(command, env, args.port)
+        try:
+            rate, p50, p99, errors = measure(url, args)
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"  {name:<16} {rate:>10.0f} {p50 * 1000:>8.2f}ms {p99 * 1000:>8.2f}ms {errors:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of the start-up of a replica.
+
+Reports the import time of the application (with the heaviest modules)
+and the time from process start to the first answered request and to
+readiness (end of the warm-up).
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 3] [--port 8765]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+def import_time():
+    """Import src.main in a fresh interpreter and parse -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative_us), int(self_us), name.strip()))
+    total = next(cumulative for cumulative, _, name in modules if name == "src.main")
+    return total / 1e6, sorted(modules, key=lambda m: m[1], reverse=True)
+
+def wait_for(client, url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(url)
+
+def time_to_first_response(port):
+    """Start the server and measure when it answers and when it is ready"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            deadline = start + 60
+            first = wait_for(client, "/api/v1/health/live", deadline)
+            ready = wait_for(client, "/api/v1/health/ready", deadline)
+    finally:
+        process.terminate()
+        process.wait()
+    return first - start, ready - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    imports = [import_time() for _ in range(args.runs)]
+    print(f"import src.main: {statistics.median(total for total, _ in imports) * 1000:.0f} ms (median of {args.runs})")
+    print("heaviest modules (self time):")
+    for cumulative, self_us, name in imports[-1][1][:10]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    timings = [time_to_first_response(args.port) for _ in range(args.runs)]
+    print(f"time to first response: {statistics.median(t for t, _ in timings) * 1000:.0f} ms (median)")
+    print(f"time to ready:          {statistics.median(t for _, t in timings) * 1000:.0f} ms (median)")
+
+if __name__ == "__main__":
+    main()
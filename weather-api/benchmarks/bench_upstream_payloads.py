@@ -0,0 +1,84 @@
+"""
+Benchmark of upstream payload size and decoding time.
+
+Builds Open-Meteo responses shaped like the former request (current_weather
+plus a week of hourly series for five variables) and the lean `current=`
+request, and measures their size and decoding time with the standard json
+module and with orjson. The same metrics are recorded in production by
+api_external_response_bytes and api_external_parse_seconds.
+
+Usage:
+    python -m benchmarks.bench_upstream_payloads [--repeat 2000] [--locations 1]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def former_open_meteo(rng):
+    hours = [(datetime(2024, 1, 1) + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(168)]
+    return {
+        "latitude": 48.86, "longitude": 2.36, "generationtime_ms": 0.5, "utc_offset_seconds": 0,
+        "timezone": "GMT", "timezone_abbreviation": "GMT", "elevation": 43.0,
+        "current_weather": {
+            "temperature": 18.4, "windspeed": 14.8, "winddirection": 250,
+            "weathercode": 3, "is_day": 1, "time": hours[0]
+        },
+        "hourly_units": {
+            "time": "iso8601", "temperature_2m": "°C", "relativehumidity_2m": "%",
+            "pressure_msl": "hPa", "windspeed_10m": "km/h", "winddirection_10m": "°"
+        },
+        "hourly": {
+            "time": hours,
+            "temperature_2m": [round(rng.uniform(5, 25), 1) for _ in hours],
+            "relativehumidity_2m": [rng.randint(30, 100) for _ in hours],
+            "pressure_msl": [round(rng.uniform(990, 1030), 1) for _ in hours],
+            "windspeed_10m": [round(rng.uniform(0, 40), 1) for _ in hours],
+            "winddirection_10m": [rng.randint(0, 359) for _ in hours],
+        },
+    }
+
+def lean_open_meteo(rng):
+    return {
+        "latitude": 48.86, "longitude": 2.36, "generationtime_ms": 0.05, "utc_offset_seconds": 0,
+        "timezone": "GMT", "timezone_abbreviation": "GMT", "elevation": 43.0,
+        "current_units": {
+            "time": "iso8601", "interval": "seconds", "temperature_2m": "°C", "relative_humidity_2m": "%",
+            "pressure_msl": "hPa", "wind_speed_10m": "km/h", "wind_direction_10m": "°", "weather_code": "wmo code"
+        },
+        "current": {
+            "time": "2024-01-01T12:00", "interval": 900, "temperature_2m": 18.4, "relative_humidity_2m": 72,
+            "pressure_msl": 1012.3, "wind_speed_10m": 14.8, "wind_direction_10m": 250, "weather_code": 3
+        },
+    }
+
+def mean_time(repeat, func, body):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(body)
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--locations", type=int, default=1, help="locations per (batched) response")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    decoders = [("json", json.loads)] + ([("orjson", orjson.loads)] if orjson else [])
+    print(f"Open-Meteo response for {args.locations} location(s)")
+    print(f"{'request':<22} {'bytes':>9}" + "".join(f" {name:>12}" for name, _ in decoders))
+    for name, build in [("current_weather+hourly", former_open_meteo), ("current= (lean)", lean_open_meteo)]:
+        payload = [build(rng) for _ in range(args.locations)]
+        body = json.dumps(payload if args.locations > 1 else payload[0]).encode()
+        timings = [mean_time(args.repeat, loads, body) for _, loads in decoders]
+        print(f"{name:<22} {len(body):>9}" + "".join(f" {t * 1e6:>10.1f}us" for t in timings))
+
+if __name__ == "__main__":
+    main()
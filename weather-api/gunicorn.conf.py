@@ -0,0 +1,31 @@
+# Gunicorn configuration for the multi-worker deployment mode:
+#   gunicorn src.main:app -c gunicorn.conf.py
+import os
+import shutil
+
+# Must be set before prometheus_client is imported: workers are forked from
+# this process and pick the multiprocess value storage at import time
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/weather-api-metrics")
+
+from prometheus_client import multiprocess  # noqa: E402
+
+from config.settings import settings  # noqa: E402
+from src.server import worker_count  # noqa: E402
+
+bind = f"0.0.0.0:{settings.PORT}"
+workers = worker_count()
+# Production profile of src/server.py: uvloop, httptools, sampled access log
+worker_class = "src.server.ProductionUvicornWorker"
+backlog = settings.SERVER_BACKLOG
+keepalive = settings.SERVER_KEEPALIVE
+accesslog = "-" if settings.ACCESS_LOG_SAMPLE_RATE > 0 else None
+
+def on_starting(server):
+    """Start from an empty metrics directory so counters of a previous run are not reported"""
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+def child_exit(server, worker):
+    """Drop the live gauges of an exited worker"""
+    multiprocess.mark_process_dead(worker.pid)
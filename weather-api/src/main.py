@@ -1,18 +1,33 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import routers
-from src.routers import weather, health
+from src.routers import weather, health, admin
 
-# Import Prometheus middleware
+# Import middlewares
 from src.middleware.prometheus import PrometheusMiddleware, metrics
+from src.middleware.compression import CompressionMiddleware
+from src.middleware.deadline import DeadlineMiddleware
+from src.middleware.admission import AdmissionMiddleware
+
+# Import the application-scoped services
+from src.services.container import container
 
 # Import settings
 from config.settings import settings
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open connections, load data and start the background probes before reporting ready
+    await container.startup()
+    yield
+    await container.shutdown()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set up CORS middleware
@@ -24,6 +39,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request deadlines and cancellation of abandoned requests
+app.add_middleware(DeadlineMiddleware)
+
+# Compress responses according to Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+
+# Shed load when too many requests are in flight or the event loop lags
+app.add_middleware(AdmissionMiddleware)
+
 # Add Prometheus middleware
 app.add_middleware(PrometheusMiddleware)
 
@@ -35,11 +59,13 @@ async def get_metrics():
 # Include routers
 app.include_router(weather.router, prefix=settings.API_V1_STR)
 app.include_router(health.router, prefix=settings.API_V1_STR)
+app.include_router(admin.router, prefix=settings.API_V1_STR)
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Weather API. Go to /docs for the API documentation."}
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("src.main:app", host="0.0.0.0", port=8000, reload=True)
+    # Same as `python -m src.server`, production profile unless SERVER_PROFILE says otherwise
+    from src.server import main
+    main()
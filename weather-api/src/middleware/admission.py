@@ -0,0 +1,76 @@
+import json
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.middleware.prometheus import track_admission
+from src.services.load_shedding import set_stale_only, reset_stale_only
+from src.services.loop_monitor import LoopLagMonitor, loop_lag_monitor
+
+from config.settings import settings
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp, max_in_flight: Optional[int] = None, monitor: Optional[LoopLagMonitor] = None):
+        """
+        Shed load before the process collapses.
+
+        The load is the number of requests in flight relative to
+        max_in_flight, together with the event-loop lag. As it grows:
+        - low-value routes (docs, history, admin) are rejected first,
+        - then weather requests are served from the cache only, stale
+          entries included, and never call the providers,
+        - then every request is rejected.
+        Rejections are 503 with Retry-After. Health checks and /metrics are
+        always admitted. max_in_flight 0 disables the admission control.
+        """
+        self.app = app
+        self.max_in_flight = max_in_flight if max_in_flight is not None else settings.ADMISSION_MAX_IN_FLIGHT
+        self.monitor = monitor or loop_lag_monitor
+        self.in_flight = 0
+
+    def _priority(self, path: str) -> str:
+        if any(path.startswith(prefix) for prefix in settings.ADMISSION_EXEMPT_PATHS):
+            return "exempt"
+        if any(path.startswith(prefix) for prefix in settings.ADMISSION_LOW_PRIORITY_PATHS):
+            return "low"
+        return "normal"
+
+    async def _reject(self, send: Send):
+        body = json.dumps({"detail": "Service overloaded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.ADMISSION_RETRY_AFTER).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.max_in_flight:
+            await self.app(scope, receive, send)
+            return
+
+        priority = self._priority(scope["path"])
+        if priority == "exempt":
+            await self.app(scope, receive, send)
+            return
+
+        load = self.in_flight / self.max_in_flight
+        lagging = self.monitor.lag >= settings.ADMISSION_LAG_THRESHOLD
+        if load >= 1.0 or (priority == "low" and (lagging or load >= settings.ADMISSION_SHED_LOW_PRIORITY_RATIO)):
+            track_admission("rejected", priority)
+            await self._reject(send)
+            return
+
+        stale_only = lagging or load >= settings.ADMISSION_STALE_ONLY_RATIO
+        track_admission("stale_only" if stale_only else "admitted", priority)
+        token = set_stale_only(stale_only)
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            reset_stale_only(token)
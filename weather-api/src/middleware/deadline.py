@@ -0,0 +1,118 @@
+import asyncio
+import json
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.middleware.prometheus import track_request_abandoned
+from src.services.deadline import set_deadline, reset_deadline
+
+from config.settings import settings
+
+class DeadlineMiddleware:
+    def __init__(self, app: ASGIApp, default_timeout: Optional[float] = None, max_timeout: Optional[float] = None):
+        """
+        Give every request a deadline and stop working on it once nobody waits for the answer.
+
+        The deadline comes from the `X-Request-Timeout` header (seconds, capped
+        at max_timeout) or default_timeout, and is available to the services
+        through src/services/deadline.py to bound upstream timeouts. The
+        handler is cancelled when the client disconnects, or when the deadline
+        passes before the response has started (the client then gets a 504).
+        A response already streaming is only stopped by a disconnect.
+        """
+        self.app = app
+        self.default_timeout = default_timeout if default_timeout is not None else settings.REQUEST_TIMEOUT_DEFAULT
+        self.max_timeout = max_timeout if max_timeout is not None else settings.REQUEST_TIMEOUT_MAX
+
+    def _timeout(self, scope: Scope) -> float:
+        value = Headers(scope=scope).get("x-request-timeout")
+        if value:
+            try:
+                timeout = float(value)
+                if timeout > 0:
+                    return min(timeout, self.max_timeout)
+            except ValueError:
+                pass
+        return self.default_timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = self._timeout(scope)
+        token = set_deadline(timeout)
+        body_received = asyncio.Event()
+        disconnected = asyncio.Event()
+        messages: asyncio.Queue = asyncio.Queue()
+        response_started = False
+
+        async def receive_wrapper() -> Message:
+            # The body is replayed from what the reader below buffered, then
+            # the only message left for the app is the disconnect
+            if not messages.empty() or not body_received.is_set():
+                return await messages.get()
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        async def read_receive():
+            # Owns the server's receive from the start, so a disconnect is
+            # seen even when the app never reads the (empty) body of a GET
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    messages.put_nowait(message)
+                    body_received.set()
+                    disconnected.set()
+                    return
+                if not body_received.is_set():
+                    messages.put_nowait(message)
+                    if not message.get("more_body", False):
+                        body_received.set()
+
+        app_task = asyncio.ensure_future(self.app(scope, receive_wrapper, send_wrapper))
+        watcher = asyncio.ensure_future(read_receive())
+        disconnect = asyncio.ensure_future(disconnected.wait())
+        try:
+            done, _ = await asyncio.wait({app_task, disconnect}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done and response_started:
+                done, _ = await asyncio.wait({app_task, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            if app_task in done:
+                app_task.result()
+                return
+
+            # Nobody will read the answer: cancel the handler and its upstream calls
+            app_task.cancel()
+            try:
+                await app_task
+            except asyncio.CancelledError:
+                pass
+            if disconnected.is_set():
+                track_request_abandoned("disconnect")
+            else:
+                track_request_abandoned("deadline")
+                if not response_started:
+                    body = json.dumps({"detail": "Request deadline exceeded"}).encode()
+                    await send({
+                        "type": "http.response.start",
+                        "status": 504,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode()),
+                        ],
+                    })
+                    await send({"type": "http.response.body", "body": body})
+        finally:
+            watcher.cancel()
+            disconnect.cancel()
+            if not app_task.done():
+                app_task.cancel()
+            reset_deadline(token)
@@ -1,8 +1,10 @@
 from prometheus_client import Counter, Histogram, Gauge
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry
+from prometheus_client import multiprocess
 from fastapi import Request, Response
+import os
 import time
-from typing import Callable
+from typing import Callable, Optional
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
@@ -22,7 +24,8 @@ REQUEST_LATENCY = Histogram(
 REQUEST_IN_PROGRESS = Gauge(
     'http_requests_in_progress',
     'Number of HTTP requests in progress',
-    ['method', 'endpoint']
+    ['method', 'endpoint'],
+    multiprocess_mode='livesum'
 )
 
 EXTERNAL_API_CALLS = Counter(
@@ -31,6 +34,121 @@ EXTERNAL_API_CALLS = Counter(
     ['api_name', 'status']
 )
 
+EXTERNAL_API_RESPONSE_BYTES = Histogram(
+    'api_external_response_bytes',
+    'Size of External API response bodies',
+    ['api_name'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576)
+)
+
+EXTERNAL_API_PARSE_SECONDS = Histogram(
+    'api_external_parse_seconds',
+    'Time spent decoding External API responses',
+    ['api_name'],
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+)
+
+API_QUOTA_REMAINING = Gauge(
+    'api_quota_remaining',
+    'Remaining shared call budget per external API',
+    ['api_name'],
+    multiprocess_mode='mostrecent'
+)
+
+CACHE_NEGATIVE_HITS = Counter(
+    'cache_negative_hits_total',
+    'Lookups answered by a negative cache entry',
+    ['data_type', 'reason']
+)
+
+PROVIDER_IN_FLIGHT = Gauge(
+    'provider_calls_in_flight',
+    'Calls holding a provider bulkhead slot',
+    ['provider'],
+    multiprocess_mode='livesum'
+)
+
+PROVIDER_CONCURRENCY_LIMIT = Gauge(
+    'provider_concurrency_limit',
+    'Slots of each provider bulkhead',
+    ['provider'],
+    multiprocess_mode='livesum'
+)
+
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds',
+    'Delay of the event loop in running a scheduled timer',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+EVENT_LOOP_SLOW_CALLBACKS = Counter(
+    'event_loop_slow_callbacks_total',
+    'Callbacks that blocked the event loop past the slow callback threshold'
+)
+
+PROVIDER_QUEUE_WAIT = Histogram(
+    'provider_queue_wait_seconds',
+    'Time waited for a provider bulkhead slot',
+    ['provider'],
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+PROVIDER_REJECTIONS = Counter(
+    'provider_bulkhead_rejections_total',
+    'Calls rejected because the provider bulkhead stayed full',
+    ['provider']
+)
+
+CACHE_HITS = Counter(
+    'cache_hits_total',
+    'Cache lookups that found a usable entry',
+    ['data_type']
+)
+
+CACHE_MISSES = Counter(
+    'cache_misses_total',
+    'Cache lookups that found no usable entry',
+    ['data_type']
+)
+
+CACHE_DECODE_ERRORS = Counter(
+    'cache_decode_errors_total',
+    'Cache entries that could not be decoded',
+    ['data_type']
+)
+
+CACHE_WRITE_FAILURES = Counter(
+    'cache_write_failures_total',
+    'Cache writes that did not reach Redis',
+    ['data_type']
+)
+
+CACHE_VALUE_BYTES = Histogram(
+    'cache_value_bytes',
+    'Size of the cached values read and written',
+    ['data_type'],
+    buckets=(256, 512, 1024, 2048, 4096, 16384, 65536, 262144)
+)
+
+CACHE_HIT_TTL_SECONDS = Histogram(
+    'cache_hit_ttl_seconds',
+    'Remaining TTL of the entries found in the cache (sampled)',
+    ['data_type'],
+    buckets=(10, 30, 60, 120, 300, 600, 900, 1800, 3600, 21600, 86400)
+)
+
+ADMISSION_DECISIONS = Counter(
+    'http_admission_decisions_total',
+    'Admission control decisions',
+    ['decision', 'priority']
+)
+
+REQUESTS_ABANDONED = Counter(
+    'http_requests_abandoned_total',
+    'Requests cancelled before completion',
+    ['reason']
+)
+
 class PrometheusMiddleware(BaseHTTPMiddleware):
     def __init__(self, app: ASGIApp):
         super().__init__(app)
@@ -75,9 +193,146 @@ def track_external_api_call(api_name: str, success: bool = True):
     status = "success" if success else "failure"
     EXTERNAL_API_CALLS.labels(api_name=api_name, status=status).inc()
 
+# Function to track the payload of external API calls
+def track_external_api_payload(api_name: str, size: int, parse_seconds: float):
+    """
+    Track the size and decoding time of an external API response.
+    
+    Args:
+        api_name: Name of the external API (e.g., 'open_meteo', 'openweather')
+        size: Response body size in bytes
+        parse_seconds: Time spent decoding the body
+    """
+    EXTERNAL_API_RESPONSE_BYTES.labels(api_name=api_name).observe(size)
+    EXTERNAL_API_PARSE_SECONDS.labels(api_name=api_name).observe(parse_seconds)
+
+# Function to track the shared upstream quota
+def track_api_quota_remaining(api_name: str, remaining: float):
+    """
+    Track the remaining call budget of an external API.
+    
+    Args:
+        api_name: Name of the external API (e.g., 'openweather', 'weatherapi')
+        remaining: Tokens left in the shared bucket
+    """
+    API_QUOTA_REMAINING.labels(api_name=api_name).set(remaining)
+
+# Function to track negative cache hits
+def track_negative_cache_hit(data_type: str, reason: str):
+    """
+    Track a lookup skipped because of a negative cache entry.
+    
+    Args:
+        data_type: Requested data (e.g., 'current', 'forecast')
+        reason: Why the entry exists ('unknown_location' or 'upstream_failure')
+    """
+    CACHE_NEGATIVE_HITS.labels(data_type=data_type, reason=reason).inc()
+
+# Function to track cancelled requests
+def track_request_abandoned(reason: str):
+    """
+    Track a request whose handler was cancelled.
+    
+    Args:
+        reason: 'deadline' or 'disconnect'
+    """
+    REQUESTS_ABANDONED.labels(reason=reason).inc()
+
+# Functions to track the event loop
+def track_loop_lag(lag: float):
+    """Track one event loop lag measurement"""
+    EVENT_LOOP_LAG.observe(lag)
+
+def track_slow_callback():
+    """Track a callback blocking the event loop"""
+    EVENT_LOOP_SLOW_CALLBACKS.inc()
+
+# Functions to track provider bulkheads
+def track_provider_slot(provider: str, in_flight: int, queue_wait: Optional[float] = None):
+    """
+    Track the occupancy of a provider bulkhead.
+    
+    Args:
+        provider: Name of the provider
+        in_flight: Calls currently holding a slot
+        queue_wait: Seconds waited for the slot just acquired
+    """
+    PROVIDER_IN_FLIGHT.labels(provider=provider).set(in_flight)
+    if queue_wait is not None:
+        PROVIDER_QUEUE_WAIT.labels(provider=provider).observe(queue_wait)
+
+def track_provider_rejection(provider: str):
+    PROVIDER_REJECTIONS.labels(provider=provider).inc()
+
+def set_provider_limit(provider: str, limit: int):
+    PROVIDER_CONCURRENCY_LIMIT.labels(provider=provider).set(limit)
+
+# Function to track cache lookups
+def track_cache_lookup(data_type: str, hit: bool, size: int = 0):
+    """
+    Track a cache lookup.
+    
+    Args:
+        data_type: Cached data ('current', 'forecast' or 'history')
+        hit: Whether a usable entry was found
+        size: Size of the entry found, in bytes
+    """
+    if hit:
+        CACHE_HITS.labels(data_type=data_type).inc()
+        CACHE_VALUE_BYTES.labels(data_type=data_type).observe(size)
+    else:
+        CACHE_MISSES.labels(data_type=data_type).inc()
+
+# Function to track cache entries that cannot be decoded
+def track_cache_decode_error(data_type: str):
+    CACHE_DECODE_ERRORS.labels(data_type=data_type).inc()
+
+# Function to track cache writes
+def track_cache_write(data_type: str, success: bool, size: int):
+    """
+    Track a cache write.
+    
+    Args:
+        data_type: Cached data ('current', 'forecast' or 'history')
+        success: Whether the value reached Redis
+        size: Size of the value in bytes
+    """
+    if not success:
+        CACHE_WRITE_FAILURES.labels(data_type=data_type).inc()
+    CACHE_VALUE_BYTES.labels(data_type=data_type).observe(size)
+
+# Function to track the remaining TTL of cache hits
+def track_cache_hit_ttl(data_type: str, ttl: float):
+    CACHE_HIT_TTL_SECONDS.labels(data_type=data_type).observe(ttl)
+
+# Function to track admission control
+def track_admission(decision: str, priority: str):
+    """
+    Track an admission control decision.
+    
+    Args:
+        decision: 'admitted', 'stale_only' or 'rejected'
+        priority: Route priority ('normal' or 'low')
+    """
+    ADMISSION_DECISIONS.labels(decision=decision, priority=priority).inc()
+
+def get_metrics_registry():
+    """
+    Registry to expose on /metrics.
+    
+    When several workers serve the app (PROMETHEUS_MULTIPROC_DIR is set),
+    each one writes its samples to the shared directory and the scraped
+    worker aggregates all of them, so the metrics cover every worker.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
 # Endpoint to expose metrics
 async def metrics(request: Request):
     return Response(
-        content=generate_latest(),
+        content=generate_latest(get_metrics_registry()),
         media_type=CONTENT_TYPE_LATEST
     )
@@ -0,0 +1,65 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
+
+from src.services.cache_admin import CacheAdmin
+from src.services.container import get_cache_admin
+from config.settings import settings
+
+async def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """The admin API is disabled unless ADMIN_TOKEN is set, and then requires it"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled")
+    # Constant-time comparison, the token must not leak through response timings
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+router = APIRouter(
+    prefix="/admin/cache",
+    tags=["admin"],
+    dependencies=[Depends(verify_admin_token)]
+)
+
+class WarmRequest(BaseModel):
+    cities: List[str] = Field(..., min_length=1)
+
+@router.delete("")
+async def invalidate_cache(
+    pattern: str = Query(..., description="Glob pattern of the keys to delete, e.g. weather:current:*"),
+    cache_admin: CacheAdmin = Depends(get_cache_admin)
+) -> Dict[str, Any]:
+    """
+    Delete the weather cache entries matching a pattern.
+    """
+    # Quota buckets and other keys sharing the Redis instance are never purged
+    if not pattern.startswith("weather:"):
+        raise HTTPException(status_code=422, detail="Pattern must start with 'weather:'")
+    deleted = await cache_admin.invalidate(pattern)
+    return {"pattern": pattern, "deleted": deleted}
+
+@router.get("/stats")
+async def cache_stats(
+    sample: Optional[int] = Query(None, ge=1, le=1000, description="Keys sampled per prefix for memory usage"),
+    cache_admin: CacheAdmin = Depends(get_cache_admin)
+) -> Dict[str, Any]:
+    """
+    Key count and estimated memory usage per cache prefix.
+    """
+    return await cache_admin.stats(sample)
+
+@router.post("/warm")
+async def warm_cache(
+    request: WarmRequest,
+    cache_admin: CacheAdmin = Depends(get_cache_admin)
+) -> Dict[str, List[str]]:
+    """
+    Fetch the current weather of a list of cities into the cache.
+    """
+    if len(request.cities) > settings.BATCH_MAX_CITIES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Between 1 and {settings.BATCH_MAX_CITIES} cities must be requested"
+        )
+    return await cache_admin.warm(request.cities)
@@ -1,8 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from typing import Dict, Any
 
-from src.services.redis_service import RedisService, get_redis_service
-import time
+from src.services.health_service import HealthService, get_health_service
 from datetime import datetime
 
 router = APIRouter(
@@ -11,56 +10,66 @@ router = APIRouter(
 )
 
 @router.get("/")
-async def health_check() -> Dict[str, Any]:
+async def health_check(health_service: HealthService = Depends(get_health_service)) -> Dict[str, Any]:
     """
     Health check endpoint to verify API status and dependencies.
-    Returns basic information about the API status.
+    Returns basic information about the API status, using the last
+    results of the background dependency probes.
     """
+    snapshot = await health_service.get_snapshot()
     return {
         "status": "ok",
         "timestamp": datetime.now().isoformat(),
-        "uptime": time.time(),
+        "uptime": health_service.uptime,
         "version": "0.1.0",
         "services": {
-            "database": "up",
-            "redis": "up",
-            "external_apis": {
-                "open_meteo": "up",
-                "openweather": "up",
-                "weatherapi": "up"
-            }
+            "database": snapshot["database"],
+            "redis": snapshot["redis"],
+            "external_apis": snapshot["external_apis"]
         }
     }
 
+@router.get("/live")
+async def liveness() -> Dict[str, Any]:
+    """
+    Liveness probe: the process is running and the event loop answers.
+    Never touches a dependency.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness(
+    response: Response,
+    health_service: HealthService = Depends(get_health_service)
+) -> Dict[str, Any]:
+    """
+    Readiness probe: the application has finished starting up and is able
+    to take traffic.
+    """
+    if not health_service.is_ready:
+        response.status_code = 503
+        return {"status": "starting"}
+    return {"status": "ready"}
+
 @router.get("/detailed", response_model=Dict[str, Any])
-async def get_detailed_health(redis_service: RedisService = Depends(get_redis_service)) -> Dict[str, Any]:
+async def get_detailed_health(health_service: HealthService = Depends(get_health_service)) -> Dict[str, Any]:
     """
-    Detailed health check that verifies connectivity to external services
-    like weather APIs, database, and cache.
+    Detailed health check that reports connectivity to external services
+    like weather APIs, database, and cache. The probes run concurrently in
+    the background, so this endpoint only reads their last results.
     """
-    # In a real implementation, we would check each dependency
-    # and report their status
-    # Check database status (placeholder for real implementation)
-    db_status = "up"  # In a real app, you'd check the DB connection
-    
-    # Check Redis status
-    redis_status = "up" if await redis_service.health_check() else "down"
-    
-    # Check external APIs status (placeholder)
-    apis_status = {
-        "open_meteo": "up",
-        "openweather": "up",
-        "weatherapi": "up"
-    }
-    
+    snapshot = await health_service.get_snapshot()
+    statuses = [snapshot["database"], snapshot["redis"], *snapshot["external_apis"].values()]
+
     return {
-        "status": "ok",
+        "status": "ok" if "down" not in statuses else "degraded",
         "timestamp": datetime.now().isoformat(),
-        "uptime": time.time(),
+        "uptime": health_service.uptime,
         "version": "0.1.0",
+        "checked_at": snapshot["checked_at"],
         "dependencies": {
-            "database": db_status,
-            "redis_cache": redis_status,
-            "external_apis": apis_status
+            "database": snapshot["database"],
+            "redis_cache": snapshot["redis"],
+            "external_apis": snapshot["external_apis"]
         }
     }
@@ -0,0 +1,80 @@
+from typing import Any, Dict, Optional, Set
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, JSON is always available
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # cbor2 is optional
+    cbor2 = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+
+# Binary encoders of the installed libraries, by media type
+ENCODERS = {}
+if msgpack is not None:
+    ENCODERS[MSGPACK] = msgpack.packb
+    ENCODERS["application/x-msgpack"] = msgpack.packb
+if cbor2 is not None:
+    ENCODERS[CBOR] = cbor2.dumps
+
+# Extra 200 representations of the weather routes, for the OpenAPI docs
+BINARY_RESPONSES: Dict[int, Dict[str, Any]] = {
+    200: {
+        "content": {media_type: {} for media_type in (MSGPACK, CBOR) if media_type in ENCODERS},
+        "description": "Successful Response. Send `Accept: application/msgpack` or "
+                       "`Accept: application/cbor` for a binary encoding of the same document.",
+    }
+}
+
+def choose_media_type(accept: str) -> Optional[str]:
+    """Binary media type preferred by an Accept header, None for JSON"""
+    best, best_q = None, 0.0
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if media_type in (JSON, "*/*", "application/*"):
+            # On equal preference JSON wins, it is the documented default
+            if q >= best_q:
+                best, best_q = None, q
+        elif media_type in ENCODERS and q > best_q:
+            best, best_q = media_type, q
+    return best
+
+def _plain(result: Any, include: Optional[Set[str]] = None) -> Any:
+    """Model(s) as plain data, with the same values as the JSON document"""
+    if isinstance(result, list):
+        return [item.model_dump(mode="json", include=include) for item in result]
+    return result.model_dump(mode="json", include=include)
+
+def render(request: Request, result: Any, include: Optional[Set[str]] = None) -> Any:
+    """
+    Encode a route result in the format negotiated with the Accept header.
+
+    Full JSON results are returned as is so FastAPI validates them against
+    the response model; trimmed documents (`include`) and binary formats
+    are encoded here.
+    """
+    media_type = choose_media_type(request.headers.get("accept", ""))
+    if media_type is None:
+        if include is None:
+            return result
+        return JSONResponse(content=_plain(result, include), headers={"Vary": "Accept"})
+    return Response(
+        content=ENCODERS[media_type](_plain(result, include)),
+        media_type=media_type,
+        headers={"Vary": "Accept"}
+    )
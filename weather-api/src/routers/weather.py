@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import FrozenSet, Optional, List, Literal
 
 from src.schemas.weather import CurrentWeather, Forecast, HistoricalWeather, ErrorResponse
 from src.services.weather_service import WeatherService
+from src.services.container import get_weather_service
+from src.services.history_export import export_history, EXPORT_MEDIA_TYPES
+from src.services.load_shedding import Overloaded
+from src.services.field_selection import CURRENT_FIELDS, parse_fields, response_fields
+from src.routers.responses import BINARY_RESPONSES, render
+from config.settings import settings
 
 router = APIRouter(
     prefix="/weather",
@@ -10,27 +17,74 @@ router = APIRouter(
     responses={404: {"model": ErrorResponse}}
 )
 
-@router.get("/current/{city}", response_model=CurrentWeather)
+async def vary_on_accept(response: Response):
+    """JSON and binary representations share the URLs"""
+    response.headers["Vary"] = "Accept"
+
+def selected_fields(
+    fields: Optional[str] = Query(
+        None,
+        description=f"Comma-separated fields to return among {', '.join(CURRENT_FIELDS)}. "
+                    "Only the providers needed for them are called."
+    )
+):
+    """Parse the `fields` parameter, None for the full document"""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.get("/current", response_model=List[CurrentWeather], responses=BINARY_RESPONSES, dependencies=[Depends(vary_on_accept)])
+async def get_current_weather_batch(
+    request: Request,
+    cities: str = Query(..., description="Comma-separated list of cities"),
+    fields: Optional[FrozenSet[str]] = Depends(selected_fields),
+    service: WeatherService = Depends(get_weather_service)
+):
+    """
+    Get current weather data for several cities at once.
+    Unknown cities are left out of the response.
+    """
+    names = [name.strip() for name in cities.split(",") if name.strip()]
+    if not names or len(names) > settings.BATCH_MAX_CITIES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Between 1 and {settings.BATCH_MAX_CITIES} cities must be requested"
+        )
+    try:
+        results = await service.get_current_weather_batch(names, fields)
+        return render(request, [result for result in results if result], response_fields(fields))
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/current/{city}", response_model=CurrentWeather, responses=BINARY_RESPONSES, dependencies=[Depends(vary_on_accept)])
 async def get_current_weather(
+    request: Request,
     city: str,
-    service: WeatherService = Depends()
+    fields: Optional[FrozenSet[str]] = Depends(selected_fields),
+    service: WeatherService = Depends(get_weather_service)
 ):
     """
     Get current weather data for a specific city.
     """
     try:
-        result = await service.get_current_weather(city)
+        result = await service.get_current_weather(city, fields)
         if not result:
             raise HTTPException(status_code=404, detail=f"Weather data for city '{city}' not found")
-        return result
+        return render(request, result, response_fields(fields))
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/forecast/{city}", response_model=Forecast)
+@router.get("/forecast/{city}", response_model=Forecast, responses=BINARY_RESPONSES, dependencies=[Depends(vary_on_accept)])
 async def get_weather_forecast(
+    request: Request,
     city: str,
-    days: Optional[int] = Query(5, ge=1, le=10),
-    service: WeatherService = Depends()
+    days: Optional[int] = Query(5, ge=1, le=settings.FORECAST_MAX_DAYS),
+    service: WeatherService = Depends(get_weather_service)
 ):
     """
     Get weather forecast for a specific city for the next X days (default 5).
@@ -39,15 +93,45 @@ async def get_weather_forecast(
         result = await service.get_forecast(city, days)
         if not result:
             raise HTTPException(status_code=404, detail=f"Forecast data for city '{city}' not found")
-        return result
+        return render(request, result)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/history/{city}", response_model=HistoricalWeather)
+@router.get(
+    "/history/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}}
+)
+async def export_weather_history(
+    cities: str = Query(..., description="Comma-separated list of cities"),
+    days: int = Query(30, ge=1, le=settings.EXPORT_MAX_DAYS),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    service: WeatherService = Depends(get_weather_service)
+):
+    """
+    Stream historical weather data of several cities as NDJSON or CSV,
+    one row per city and day. Unknown cities are left out.
+    """
+    names = [name.strip() for name in cities.split(",") if name.strip()]
+    if not names or len(names) > settings.EXPORT_MAX_CITIES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Between 1 and {settings.EXPORT_MAX_CITIES} cities must be requested"
+        )
+    return StreamingResponse(
+        export_history(service, names, days, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="history.{format}"'}
+    )
+
+@router.get("/history/{city}", response_model=HistoricalWeather, responses=BINARY_RESPONSES, dependencies=[Depends(vary_on_accept)])
 async def get_weather_history(
+    request: Request,
     city: str,
     days: Optional[int] = Query(5, ge=1, le=30),
-    service: WeatherService = Depends()
+    service: WeatherService = Depends(get_weather_service)
 ):
     """
     Get historical weather data for a specific city for the past X days (default 5).
@@ -56,6 +140,8 @@ async def get_weather_history(
         result = await service.get_history(city, days)
         if not result:
             raise HTTPException(status_code=404, detail=f"Historical data for city '{city}' not found")
-        return result
+        return render(request, result)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
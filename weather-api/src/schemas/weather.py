@@ -30,6 +30,7 @@ class CurrentWeather(BaseModel):
     conditions: Optional[WeatherCondition] = None
     timestamp: datetime = Field(default_factory=datetime.now)
     sources: List[str] = []
+    spread: Optional[Dict[str, float]] = None  # max - min of each field across sources
 
 class ForecastItem(BaseModel):
     timestamp: datetime
@@ -0,0 +1,162 @@
+"""
+Server launcher.
+
+Profiles:
+    production   uvloop and httptools, tuned backlog and keep-alive, no
+                 reload, sampled access log, one worker per CPU
+    development  uvicorn defaults with auto-reload, one worker
+
+Usage:
+    python -m src.server [--profile production] [--port 8000] [--workers N]
+
+Several workers are always run by gunicorn (gunicorn.conf.py and
+ProductionUvicornWorker below), as in the Dockerfile: it restarts
+crashed workers and drops the Prometheus gauges of the dead ones,
+which uvicorn's own process manager does not.
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+from pathlib import Path
+from copy import deepcopy
+from typing import Any, Dict, Optional
+
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+
+from config.settings import settings
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional (not available on Windows), asyncio is used instead
+    uvloop = None
+
+try:
+    import httptools
+except ImportError:  # httptools is optional, h11 is used instead
+    httptools = None
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:
+    try:
+        # Deprecated location, kept by uvicorn for now
+        from uvicorn.workers import UvicornWorker
+    except ImportError:  # gunicorn is not installed
+        UvicornWorker = None
+
+PROFILES = ("production", "development")
+
+def cpu_count() -> int:
+    """CPUs this process may run on, honouring affinity and cpusets"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def worker_count() -> int:
+    """WORKERS, or one asyncio worker per available CPU"""
+    return settings.WORKERS or cpu_count()
+
+class AccessLogSampler(logging.Filter):
+    def __init__(self, rate: float = 1.0):
+        """
+        Keep a random share of the uvicorn access log records, and every
+        server error, so the log stays useful without a write per request.
+        """
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn.access args: client, method, path, HTTP version, status code
+        args = record.args if isinstance(record.args, tuple) else ()
+        if len(args) == 5 and isinstance(args[4], int) and args[4] >= 500:
+            return True
+        return random.random() < self.rate
+
+GUNICORN_CONFIG = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+def warn_missing_protocols():
+    if uvloop is None or httptools is None:
+        print("uvloop or httptools not installed, falling back to asyncio and h11")
+
+def protocol_options() -> Dict[str, Any]:
+    """Event loop and HTTP parser of the production profile"""
+    return {
+        "loop": "uvloop" if uvloop is not None else "asyncio",
+        "http": "httptools" if httptools is not None else "h11",
+        "h11_max_incomplete_event_size": settings.SERVER_H11_MAX_INCOMPLETE_EVENT_SIZE,
+        # One less header to write on every response
+        "server_header": False,
+    }
+
+def access_log_config(rate: float) -> Dict[str, Any]:
+    """uvicorn logging configuration with a sampled access log"""
+    config = deepcopy(LOGGING_CONFIG)
+    config["filters"] = {"sample": {"()": AccessLogSampler, "rate": rate}}
+    config["handlers"]["access"]["filters"] = ["sample"]
+    return config
+
+def server_options(profile: str, workers: Optional[int] = None) -> Dict[str, Any]:
+    """uvicorn.run() options of a profile"""
+    if profile == "development":
+        return {"reload": True}
+    if profile != "production":
+        raise ValueError(f"Unknown server profile '{profile}', expected one of {', '.join(PROFILES)}")
+
+    rate = settings.ACCESS_LOG_SAMPLE_RATE
+    options = {
+        **protocol_options(),
+        "reload": False,
+        "workers": workers or worker_count(),
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE,
+        "access_log": rate > 0,
+    }
+    if rate > 0:
+        options["log_config"] = access_log_config(rate)
+    return options
+
+if UvicornWorker is not None:
+    class ProductionUvicornWorker(UvicornWorker):
+        """Gunicorn worker running the production profile (backlog and keep-alive come from gunicorn.conf.py)"""
+
+        def __init__(self, *args, **kwargs):
+            # Read by UvicornWorker.__init__, built here so settings are those of the worker
+            self.CONFIG_KWARGS = {**protocol_options(), "access_log": settings.ACCESS_LOG_SAMPLE_RATE > 0}
+            warn_missing_protocols()
+            super().__init__(*args, **kwargs)
+            if settings.ACCESS_LOG_SAMPLE_RATE > 0:
+                logging.getLogger("uvicorn.access").addFilter(AccessLogSampler(settings.ACCESS_LOG_SAMPLE_RATE))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=PROFILES, default=settings.SERVER_PROFILE)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    options = server_options(args.profile, args.workers)
+    if options.get("workers", 1) > 1:
+        run_gunicorn(args.host, args.port, options["workers"])
+        return
+    if args.profile == "production":
+        warn_missing_protocols()
+    uvicorn.run("src.main:app", host=args.host, port=args.port, **options)
+
+def run_gunicorn(host: str, port: int, workers: int):
+    """Replace this process by gunicorn serving the production profile"""
+    if UvicornWorker is None:
+        sys.exit("Running several workers requires gunicorn, use --workers 1 without it")
+    os.execvp(sys.executable, [
+        sys.executable, "-m", "gunicorn", "src.main:app",
+        "-c", str(GUNICORN_CONFIG),
+        "--bind", f"{host}:{port}",
+        "--workers", str(workers),
+    ])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import math
+from operator import attrgetter
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from src.services.observation import ProviderObservation
+
+from config.settings import settings
+
+# Numeric fields aggregated across sources, read from each observation
+FIELDS = ("temperature", "humidity", "pressure", "wind_speed", "wind_direction")
+_read_fields = attrgetter(*FIELDS)
+# Fields whose cross-source spread is reported
+SPREAD_FIELDS = ("temperature", "humidity", "pressure", "wind_speed")
+
+class AggregationEngine:
+    def __init__(self, source_weights: Optional[Dict[str, float]] = None, batch_min_cities: Optional[int] = None):
+        """
+        Aggregation of provider results: a plain loop per city, or one
+        vectorized NumPy pass for batches of at least `batch_min_cities`,
+        where the array setup pays for itself.
+
+        Args:
+            source_weights: Weight of each source in the means (unknown sources weigh 1.0)
+            batch_min_cities: Smallest batch aggregated with NumPy
+        """
+        self.source_weights = dict(source_weights if source_weights is not None else settings.PROVIDER_WEIGHTS)
+        self.batch_min_cities = batch_min_cities if batch_min_cities is not None else settings.AGGREGATION_BATCH_MIN_CITIES
+
+    def to_columns(self, results_by_city: Sequence[Sequence[ProviderObservation]]) -> Dict[str, Any]:
+        """
+        Lay out provider observations of many cities as columnar arrays.
+
+        Each field becomes a (cities, sources) float array where missing
+        values are NaN.
+        """
+        sources = list(self.source_weights)
+        for results in results_by_city:
+            for result in results:
+                if result.source not in sources:
+                    sources.append(result.source)
+        index = {source: i for i, source in enumerate(sources)}
+
+        # One scatter of every observation into (fields, cities, sources), None becoming NaN
+        observations = [result for results in results_by_city for result in results]
+        values = np.full((len(FIELDS), len(results_by_city), len(sources)), np.nan)
+        if observations:
+            cities = np.repeat(np.arange(len(results_by_city)), [len(results) for results in results_by_city])
+            slots = [index[result.source] for result in observations]
+            values[:, cities, slots] = np.array(list(map(_read_fields, observations)), dtype=float).T
+
+        return {
+            "sources": sources,
+            "weights": np.array([self.source_weights.get(s, 1.0) for s in sources]),
+            **{field: values[i] for i, field in enumerate(FIELDS)},
+        }
+
+    def aggregate(self, columns: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Compute weighted means, the circular mean of wind direction and the
+        cross-source spread (max - min) of every field in one pass.
+
+        Returns per-city arrays; NaN means no source reported the field.
+        """
+        weights = columns["weights"]
+        aggregated = {}
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for field in SPREAD_FIELDS:
+                values = columns[field]
+                present = ~np.isnan(values)
+                w = np.where(present, weights, 0.0)
+                aggregated[field] = np.where(present, values, 0.0).dot(weights) / w.sum(axis=1)
+                aggregated[field][~present.any(axis=1)] = np.nan
+
+                spread = np.fmax.reduce(values, axis=1) - np.fmin.reduce(values, axis=1)
+                aggregated[f"{field}_spread"] = spread
+
+            # Wind direction is an angle: average the unit vectors instead of the degrees
+            directions = np.radians(columns["wind_direction"])
+            present = ~np.isnan(directions)
+            w = np.where(present, weights, 0.0)
+            sin = (np.sin(np.where(present, directions, 0.0)) * w).sum(axis=1)
+            cos = (np.cos(np.where(present, directions, 0.0)) * w).sum(axis=1)
+            direction = np.degrees(np.arctan2(sin, cos)) % 360
+            direction[~present.any(axis=1)] = np.nan
+            aggregated["wind_direction"] = direction
+
+        return aggregated
+
+    def _best_conditions(self, results: Sequence[ProviderObservation]) -> Optional[Dict[str, Any]]:
+        """Condition of the highest-weighted source reporting one"""
+        best, best_weight = None, None
+        for result in results:
+            weight = self.source_weights.get(result.source, 1.0)
+            if result.condition and (best is None or weight > best_weight):
+                best, best_weight = result, weight
+        return {"main": best.condition, "description": best.description} if best else None
+
+    def aggregate_one(self, results: Sequence[ProviderObservation]) -> Dict[str, Any]:
+        """
+        Aggregate the provider observations of one city in a single loop,
+        with the same results as the vectorized pass but none of its setup.
+        """
+        sums = [0.0] * len(SPREAD_FIELDS)
+        totals = [0.0] * len(SPREAD_FIELDS)
+        lows: List[Optional[float]] = [None] * len(SPREAD_FIELDS)
+        highs: List[Optional[float]] = [None] * len(SPREAD_FIELDS)
+        sin = cos = 0.0
+        has_direction = False
+
+        for result in results:
+            weight = self.source_weights.get(result.source, 1.0)
+            values = _read_fields(result)
+            for i in range(len(SPREAD_FIELDS)):
+                value = values[i]
+                if value is None:
+                    continue
+                sums[i] += value * weight
+                totals[i] += weight
+                if lows[i] is None:
+                    lows[i] = highs[i] = value
+                elif value < lows[i]:
+                    lows[i] = value
+                elif value > highs[i]:
+                    highs[i] = value
+            # Wind direction is an angle: average the unit vectors instead of the degrees
+            direction = values[-1]
+            if direction is not None:
+                angle = math.radians(direction)
+                sin += math.sin(angle) * weight
+                cos += math.cos(angle) * weight
+                has_direction = True
+
+        row: Dict[str, Any] = {}
+        spread = {}
+        for i, field in enumerate(SPREAD_FIELDS):
+            if totals[i]:
+                row[field] = sums[i] / totals[i]
+                spread[field] = highs[i] - lows[i]
+            else:
+                row[field] = None
+        row["wind_direction"] = math.degrees(math.atan2(sin, cos)) % 360 if has_direction else None
+        row["spread"] = spread
+        row["conditions"] = self._best_conditions(results)
+        row["sources"] = [result.source for result in results]
+        return row
+
+    def aggregate_results(self, results_by_city: Sequence[Sequence[ProviderObservation]]) -> List[Dict[str, Any]]:
+        """
+        Aggregate the provider observations of many cities.
+
+        Returns one dict per city with the aggregated values (None when
+        missing), the spread of each field across sources and the
+        condition of the highest-weighted source.
+        """
+        if len(results_by_city) < self.batch_min_cities:
+            return [self.aggregate_one(results) for results in results_by_city]
+
+        aggregated = self.aggregate(self.to_columns(results_by_city))
+
+        # Convert once to Python floats, with None for missing values
+        columns = [[None if value != value else value for value in aggregated[field].tolist()] for field in FIELDS]
+        spreads = [aggregated[f"{field}_spread"].tolist() for field in SPREAD_FIELDS]
+
+        rows = []
+        for values, spread, results in zip(zip(*columns), zip(*spreads), results_by_city):
+            row = dict(zip(FIELDS, values))
+            row["spread"] = {field: value for field, value in zip(SPREAD_FIELDS, spread) if value == value}
+            row["conditions"] = self._best_conditions(results)
+            row["sources"] = [r.source for r in results]
+            rows.append(row)
+        return rows
+
+# Singleton instance
+aggregation_engine = AggregationEngine()
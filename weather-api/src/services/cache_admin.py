@@ -0,0 +1,76 @@
+from typing import Dict, Any, List, Optional
+
+from src.services.redis_service import RedisService
+from src.services.weather_service import WeatherService
+
+from config.settings import settings
+
+# Key families reported by the stats, matched on their leading segments
+CACHE_PREFIXES = ("weather:current", "weather:forecast", "weather:history", "quota")
+
+def key_prefix(key: str) -> Optional[str]:
+    for prefix in CACHE_PREFIXES:
+        if key.startswith(prefix + ":"):
+            return prefix
+    return None
+
+class CacheAdmin:
+    def __init__(self, redis_service: RedisService, weather_service: WeatherService):
+        """Inspection and maintenance of the cache keyspace"""
+        self.redis_service = redis_service
+        self.weather_service = weather_service
+
+    async def invalidate(self, pattern: str) -> int:
+        """Delete the cache entries matching a glob pattern"""
+        return await self.redis_service.delete_pattern(pattern)
+
+    async def stats(self, sample_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Key count per prefix, with memory usage measured on a sample of keys
+        and extrapolated to the whole prefix.
+        """
+        sample_size = sample_size if sample_size is not None else settings.ADMIN_STATS_SAMPLE_SIZE
+        counts = {prefix: 0 for prefix in CACHE_PREFIXES}
+        samples: Dict[str, List[str]] = {prefix: [] for prefix in CACHE_PREFIXES}
+
+        client = await self.redis_service.get_redis()
+        if not client:
+            return {"redis": "down", "prefixes": {}}
+
+        for pattern in ("weather:*", "quota:*"):
+            async for key in client.scan_iter(match=pattern, count=1000):
+                prefix = key_prefix(key)
+                if prefix is None:
+                    continue
+                counts[prefix] += 1
+                # SCAN order follows the hash table, so the first keys are a fair sample
+                if len(samples[prefix]) < sample_size:
+                    samples[prefix].append(key)
+
+        sampled = [key for prefix in CACHE_PREFIXES for key in samples[prefix]]
+        usage = {}
+        if sampled:
+            async with client.pipeline(transaction=False) as pipe:
+                for key in sampled:
+                    pipe.memory_usage(key)
+                usage = dict(zip(sampled, await pipe.execute()))
+
+        prefixes = {}
+        for prefix in CACHE_PREFIXES:
+            sizes = [usage[key] for key in samples[prefix] if usage.get(key) is not None]
+            average = sum(sizes) / len(sizes) if sizes else 0
+            prefixes[prefix] = {
+                "keys": counts[prefix],
+                "sampled": len(sizes),
+                "average_bytes": round(average),
+                "estimated_bytes": round(average * counts[prefix]),
+            }
+        return {"redis": "up", "prefixes": prefixes}
+
+    async def warm(self, cities: List[str]) -> Dict[str, List[str]]:
+        """Fetch the current weather of the cities into the cache"""
+        results = await self.weather_service.get_current_weather_batch(cities)
+        return {
+            "warmed": [city for city, result in zip(cities, results) if result],
+            "failed": [city for city, result in zip(cities, results) if not result],
+        }
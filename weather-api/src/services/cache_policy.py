@@ -0,0 +1,85 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from config.settings import settings
+
+class TTLPolicy:
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, int]] = None,
+        update_intervals: Optional[Dict[str, int]] = None,
+        update_delay: Optional[int] = None,
+        min_ttl: Optional[int] = None,
+        max_stable_ttl: Optional[int] = None,
+        stable_delta: Optional[float] = None
+    ):
+        """
+        Expiry of cache entries per data type.
+
+        Args:
+            ttls: Default TTL in seconds per data type (current, forecast, history)
+            update_intervals: Provider update cadence in seconds per data type (0 to disable alignment)
+            update_delay: Seconds after an update boundary before new data is published
+            min_ttl: Lower bound of any TTL
+            max_stable_ttl: Upper bound of a current TTL lengthened for a stable city
+            stable_delta: Temperature change (celsius) under which a city counts as stable
+        """
+        self.ttls = ttls if ttls is not None else {
+            "current": settings.CACHE_EXPIRATION,
+            "forecast": settings.CACHE_TTL_FORECAST,
+            "history": settings.CACHE_TTL_HISTORY,
+        }
+        self.update_intervals = update_intervals if update_intervals is not None else {
+            "current": settings.OPEN_METEO_CURRENT_UPDATE_INTERVAL,
+            "forecast": settings.OPEN_METEO_FORECAST_UPDATE_INTERVAL,
+        }
+        self.update_delay = update_delay if update_delay is not None else settings.CACHE_UPDATE_DELAY
+        self.min_ttl = min_ttl if min_ttl is not None else settings.CACHE_MIN_TTL
+        self.max_stable_ttl = max_stable_ttl if max_stable_ttl is not None else settings.CACHE_MAX_STABLE_TTL
+        self.stable_delta = stable_delta if stable_delta is not None else settings.CACHE_STABLE_DELTA
+        # city -> (last temperature, number of consecutive stable refreshes)
+        self._stability: Dict[str, Tuple[float, int]] = {}
+
+    def _until_next_update(self, interval: int, now: float) -> int:
+        """Seconds until the next provider update boundary has been published"""
+        return int(interval - now % interval) + self.update_delay
+
+    def _stable_streak(self, city: str, temperature: float) -> int:
+        """Record a fresh value for the city and return how many refreshes in a row it barely changed"""
+        previous = self._stability.get(city)
+        streak = 0
+        if previous is not None and abs(temperature - previous[0]) <= self.stable_delta:
+            streak = previous[1] + 1
+        self._stability[city] = (temperature, streak)
+        return streak
+
+    def ttl_for(
+        self,
+        data_type: str,
+        city: Optional[str] = None,
+        temperature: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> int:
+        """
+        TTL in seconds for a freshly fetched entry.
+
+        When the provider cadence is known the entry expires just after the
+        next provider update, since refreshing earlier returns the same data.
+        Current data of a city whose temperature has been stable is kept for
+        additional update cycles, up to max_stable_ttl.
+        """
+        now = time.time() if now is None else now
+        base = self.ttls[data_type]
+        interval = self.update_intervals.get(data_type, 0)
+
+        ttl = self._until_next_update(interval, now) if interval else base
+
+        if data_type == "current" and city is not None and temperature is not None:
+            streak = self._stable_streak(city.lower(), temperature)
+            if streak:
+                ttl = max(ttl, min(ttl + streak * (interval or base), self.max_stable_ttl))
+
+        return max(ttl, self.min_ttl)
+
+# Singleton instance
+ttl_policy = TTLPolicy()
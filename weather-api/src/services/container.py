@@ -0,0 +1,63 @@
+from typing import Optional
+
+from src.services.cache_admin import CacheAdmin
+from src.services.loop_monitor import loop_lag_monitor
+from src.services.health_service import HealthService, health_service as default_health_service
+from src.services.http_client import close_http_client
+from src.services.provider_registry import ProviderRegistry, provider_registry as default_provider_registry
+from src.services.quota_service import QuotaManager, quota_manager as default_quota_manager
+from src.services.redis_service import RedisService, redis_service as default_redis_service
+from src.services.warmup import warm_up
+from src.services.weather_service import WeatherService
+
+class ServiceContainer:
+    def __init__(
+        self,
+        redis_service: Optional[RedisService] = None,
+        quota_manager: Optional[QuotaManager] = None,
+        health_service: Optional[HealthService] = None,
+        weather_service: Optional[WeatherService] = None,
+        provider_registry: Optional[ProviderRegistry] = None
+    ):
+        """
+        Application-scoped services, wired once at start-up and shared by
+        every request. Any service can be replaced, e.g. by a mock in tests.
+        """
+        self.redis_service = redis_service or default_redis_service
+        self.quota_manager = quota_manager or default_quota_manager
+        self.health_service = health_service or default_health_service
+        self.provider_registry = provider_registry or default_provider_registry
+        self.weather_service = weather_service or WeatherService(
+            self.redis_service, self.quota_manager, provider_registry=self.provider_registry
+        )
+        self.cache_admin = CacheAdmin(self.redis_service, self.weather_service)
+
+    async def startup(self):
+        """Warm up the services, start background tasks and report ready"""
+        await warm_up(self.redis_service, self.health_service)
+        await self.health_service.start()
+        await loop_lag_monitor.start()
+        self.health_service.mark_ready()
+
+    async def shutdown(self):
+        """Stop background tasks and close connections"""
+        await self.health_service.stop()
+        await loop_lag_monitor.stop()
+        await self.weather_service.close()
+        await self.provider_registry.close()
+        await close_http_client()
+        await self.redis_service.close()
+
+# Singleton instance
+container = ServiceContainer()
+
+# Dependencies for FastAPI: a plain attribute read per request.
+# Override them with app.dependency_overrides in tests.
+async def get_container() -> ServiceContainer:
+    return container
+
+async def get_weather_service() -> WeatherService:
+    return container.weather_service
+
+async def get_cache_admin() -> CacheAdmin:
+    return container.cache_admin
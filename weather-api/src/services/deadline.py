@@ -0,0 +1,45 @@
+import time
+from contextvars import ContextVar, Token
+from typing import Optional
+
+# Absolute time.monotonic() deadline of the request being served. Tasks
+# created while serving the request copy the context and so inherit it.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an upstream call would start after the request deadline"""
+
+def set_deadline(timeout: float) -> Token:
+    """Set the deadline of the current request, `timeout` seconds from now"""
+    return _deadline.set(time.monotonic() + timeout)
+
+def reset_deadline(token: Token):
+    _deadline.reset(token)
+
+def get_deadline() -> Optional[float]:
+    """Absolute deadline of the current request, None outside a request"""
+    return _deadline.get()
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline, None outside a request"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+def bounded_timeout(timeout: float, deadline: Optional[float] = None) -> float:
+    """
+    Timeout of an upstream call: `timeout`, shortened to the time left
+    before the deadline (the current request's unless given).
+    """
+    deadline = deadline if deadline is not None else _deadline.get()
+    if deadline is None:
+        return timeout
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return min(timeout, left)
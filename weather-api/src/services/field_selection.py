@@ -0,0 +1,55 @@
+from typing import FrozenSet, Iterable, Optional, Set, Tuple
+
+from config.settings import settings
+
+# Selectable fields of a current weather
+CURRENT_FIELDS = ("temperature", "humidity", "pressure", "wind", "conditions")
+# Always returned, they identify the observation
+BASE_FIELDS = ("city", "country", "coordinates", "timestamp", "sources")
+# Providers by order of preference: keyless and batched first, quota-bound last
+PROVIDERS = ("open_meteo", "openweather", "weatherapi")
+
+def parse_fields(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a comma-separated `fields` parameter, None meaning every field.
+    Raises ValueError for an empty selection or unknown fields.
+    """
+    if value is None:
+        return None
+    fields = frozenset(name.strip() for name in value.split(",") if name.strip())
+    unknown = fields - set(CURRENT_FIELDS)
+    if not fields or unknown:
+        raise ValueError(f"fields must be a comma-separated subset of {', '.join(CURRENT_FIELDS)}")
+    return fields
+
+def plan_providers(fields: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """Providers to call for the requested fields, all of them for a full observation"""
+    if fields is None:
+        return PROVIDERS
+    missing = set(fields)
+    plan = []
+    for provider in PROVIDERS:
+        provided = missing & set(settings.PROVIDER_FIELDS.get(provider, ()))
+        if provided:
+            plan.append(provider)
+            missing -= provided
+        if not missing:
+            break
+    return tuple(plan)
+
+def current_cache_key(city: str, providers: Tuple[str, ...] = PROVIDERS) -> str:
+    """
+    Cache key of a current weather aggregated from the given providers.
+    Keyed by provider plan rather than fields, so every field subset
+    served by the same providers shares one entry.
+    """
+    key = f"weather:current:{city.lower()}"
+    if providers == PROVIDERS:
+        return key
+    return f"{key}:{'+'.join(providers)}"
+
+def response_fields(fields: Optional[FrozenSet[str]]) -> Optional[Set[str]]:
+    """Top-level fields of a trimmed response, None for the full document"""
+    if fields is None:
+        return None
+    return set(BASE_FIELDS) | fields
@@ -0,0 +1,19 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+CITIES_FILE = Path(__file__).resolve().parent.parent / "data" / "cities.json"
+
+@lru_cache(maxsize=1)
+def load_city_coordinates() -> Dict[str, Dict[str, float]]:
+    """
+    Load the city coordinates mapping once per process.
+    In a real app, you'd use a geocoding service.
+    """
+    with open(CITIES_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+def get_city_coordinates(city: str) -> Optional[Dict[str, float]]:
+    """Get coordinates for a city from our simple mapping"""
+    return load_city_coordinates().get(city.lower())
@@ -0,0 +1,157 @@
+import asyncio
+import math
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import httpx
+
+from src.services.redis_service import RedisService, redis_service
+from src.services.http_client import get_http_client
+from src.services.provider_registry import ProviderRegistry, provider_registry
+from config.settings import settings
+
+# Lightweight endpoints used to check that each provider is reachable.
+# The keyed providers are called without a key: a 401 still proves the
+# service answers, and it does not consume any of our quota.
+PROVIDER_PING_URLS = {
+    "open_meteo": f"{settings.OPEN_METEO_BASE_URL}/forecast?latitude=0&longitude=0&current_weather=true",
+    "openweather": "https://api.openweathermap.org/data/2.5/weather",
+    "weatherapi": "https://api.weatherapi.com/v1/current.json",
+}
+
+class HealthService:
+    def __init__(
+        self,
+        redis_service: RedisService,
+        interval: Optional[float] = None,
+        probe_timeout: Optional[float] = None,
+        provider_registry: Optional[ProviderRegistry] = None
+    ):
+        """Probe dependencies in the background and keep the last results in memory"""
+        self.redis_service = redis_service
+        self.provider_registry = provider_registry
+        self.interval = interval if interval is not None else settings.HEALTH_CHECK_INTERVAL
+        self.probe_timeout = probe_timeout if probe_timeout is not None else settings.HEALTH_PROBE_TIMEOUT
+        self.started_at = time.time()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._db_engine = None
+        self._ready = False
+
+    async def _probe_redis(self) -> bool:
+        return await self.redis_service.health_check()
+
+    def _select_one(self) -> bool:
+        # SQLAlchemy is only needed for this probe, so it is imported lazily
+        from sqlalchemy import create_engine, text
+
+        if self._db_engine is None:
+            # wait_for cannot stop this thread: libpq must give up on its own,
+            # or hung connects pile up threads in the default executor
+            self._db_engine = create_engine(
+                settings.DATABASE_URL,
+                pool_pre_ping=True,
+                pool_size=1,
+                connect_args={"connect_timeout": max(1, math.ceil(self.probe_timeout))}
+            )
+        with self._db_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+
+    async def _probe_database(self) -> bool:
+        return await asyncio.to_thread(self._select_one)
+
+    async def _probe_provider(self, client: httpx.AsyncClient, url: str) -> bool:
+        response = await client.get(url, timeout=self.probe_timeout)
+        return response.status_code < 500
+
+    async def _run_probe(self, probe) -> str:
+        """Run a single probe with its own timeout and map the outcome to a status"""
+        try:
+            ok = await asyncio.wait_for(probe, timeout=self.probe_timeout)
+            return "up" if ok else "down"
+        except Exception as e:
+            print(f"Health probe error: {e!r}")
+            return "down"
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Run every probe concurrently and store the results as the current snapshot"""
+        # Each provider is pinged through its own pool, which keeps its connections warm
+        clients = {
+            name: self.provider_registry.get(name).client if self.provider_registry else get_http_client()
+            for name in PROVIDER_PING_URLS
+        }
+        names = ["redis", "database", *PROVIDER_PING_URLS]
+        probes = [self._probe_redis()]
+        if settings.DATABASE_URL:
+            probes.append(self._probe_database())
+        else:
+            names.remove("database")
+        probes.extend(self._probe_provider(clients[name], url) for name, url in PROVIDER_PING_URLS.items())
+
+        statuses = await asyncio.gather(*(self._run_probe(p) for p in probes))
+
+        results = dict(zip(names, statuses))
+        self._snapshot = {
+            "checked_at": datetime.now().isoformat(),
+            "database": results.get("database", "not_configured"),
+            "redis": results["redis"],
+            "external_apis": {name: results[name] for name in PROVIDER_PING_URLS},
+        }
+        return self._snapshot
+
+    async def _refresh_loop(self, delay: float):
+        await asyncio.sleep(delay)
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Health refresh error: {e!r}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        """Start the background refresher"""
+        if self._task is None:
+            # Skip the first round when the warm-up has just probed everything
+            delay = self.interval if self._snapshot is not None else 0
+            self._task = asyncio.create_task(self._refresh_loop(delay))
+
+    async def stop(self):
+        """Stop the background refresher"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._db_engine is not None:
+            self._db_engine.dispose()
+            self._db_engine = None
+        self._ready = False
+
+    def mark_ready(self):
+        """Called once the application has finished warming up"""
+        self._ready = True
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready and self._snapshot is not None
+
+    @property
+    def uptime(self) -> float:
+        return time.time() - self.started_at
+
+    async def get_snapshot(self) -> Dict[str, Any]:
+        """Return the cached probe results, probing once if the refresher has not run yet"""
+        if self._snapshot is None:
+            return await self.refresh()
+        return self._snapshot
+
+# Singleton instance
+health_service = HealthService(redis_service, provider_registry=provider_registry)
+
+# Dependency for FastAPI
+async def get_health_service() -> HealthService:
+    return health_service
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, Any, List, Optional
+
+from src.schemas.weather import ForecastItem
+from src.services.weather_service import WeatherService
+
+from config.settings import settings
+
+# Columns of an exported row, in CSV order
+EXPORT_COLUMNS = (
+    "city",
+    "timestamp",
+    "temperature",
+    "humidity",
+    "pressure",
+    "wind_speed",
+    "wind_direction",
+    "conditions",
+    "description",
+)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _row(city: str, item: ForecastItem) -> Dict[str, Any]:
+    """Flatten one day of data"""
+    return {
+        "city": city,
+        "timestamp": item.timestamp.isoformat(),
+        "temperature": item.temperature.current,
+        "humidity": item.humidity,
+        "pressure": item.pressure,
+        "wind_speed": item.wind.speed if item.wind else None,
+        "wind_direction": item.wind.direction if item.wind else None,
+        "conditions": item.conditions.main if item.conditions else None,
+        "description": item.conditions.description if item.conditions else None,
+    }
+
+def _encode(rows: List[Dict[str, Any]], fmt: str) -> bytes:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([row[column] for column in EXPORT_COLUMNS] for row in rows)
+        return buffer.getvalue().encode()
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+async def export_history(
+    service: WeatherService,
+    cities: List[str],
+    days: int,
+    fmt: str = "ndjson",
+    chunk_rows: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Stream the history of several cities as NDJSON or CSV.
+
+    Rows are encoded in chunks of `chunk_rows`, so memory use depends on the
+    chunk size only, not on the number of cities or days.
+    """
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+    if fmt == "csv":
+        yield (",".join(EXPORT_COLUMNS) + "\r\n").encode()
+
+    rows = []
+    for city in cities:
+        async for item in service.iter_history(city, days):
+            rows.append(_row(city, item))
+            if len(rows) >= chunk_rows:
+                yield _encode(rows, fmt)
+                rows = []
+    if rows:
+        yield _encode(rows, fmt)
@@ -0,0 +1,41 @@
+import json
+import time
+from typing import Any, Optional
+
+import httpx
+
+from src.middleware.prometheus import track_external_api_payload
+
+from config.settings import settings
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional, the standard decoder is the fallback
+    _loads = json.loads
+
+# Shared client so connections to the providers are pooled and kept alive
+# between requests instead of being opened for every call
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=settings.PROVIDER_TIMEOUT)
+    return _client
+
+async def close_http_client():
+    """Close the shared HTTP client and its connection pool"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def parse_json(response: httpx.Response, api_name: str) -> Any:
+    """Decode a provider response, recording its size and parse time"""
+    content = response.content
+    start = time.perf_counter()
+    data = _loads(content)
+    track_external_api_payload(api_name, len(content), time.perf_counter() - start)
+    return data
@@ -0,0 +1,24 @@
+from contextvars import ContextVar, Token
+from typing import Optional
+
+from config.settings import settings
+
+# Set by the admission middleware when the process is overloaded: requests
+# are then answered from the cache only, possibly stale, never upstream.
+_stale_only: ContextVar[bool] = ContextVar("stale_only", default=False)
+
+class Overloaded(Exception):
+    """Raised when a request would need an upstream call while shedding load"""
+
+    def __init__(self, retry_after: Optional[int] = None):
+        super().__init__("Service overloaded, retry later")
+        self.retry_after = retry_after if retry_after is not None else settings.ADMISSION_RETRY_AFTER
+
+def set_stale_only(stale_only: bool) -> Token:
+    return _stale_only.set(stale_only)
+
+def reset_stale_only(token: Token):
+    _stale_only.reset(token)
+
+def is_stale_only() -> bool:
+    return _stale_only.get()
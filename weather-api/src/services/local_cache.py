@@ -0,0 +1,226 @@
+import asyncio
+import fnmatch
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config.settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no locking, so files of other workers are never merged
+    fcntl = None
+
+class LocalCache:
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        stale_ttl: Optional[int] = None
+    ):
+        """
+        Local persistent cache tier, one append-only file per worker.
+
+        Every write updates an in-memory index, so reads never touch the
+        disk, and appends a JSON line `[key, expires_at, value]` (value null
+        for a deletion) from a single writer thread, so the event loop never
+        waits for the disk. When the file grows past `max_bytes` the writer
+        compacts it to the live entries. Entries are kept `stale_ttl`
+        seconds past their expiry so they can still be served while
+        upstreams are unavailable.
+
+        Files left by exited workers (no longer locked) are merged at start,
+        which gives a warm cache after a restart.
+
+        Args:
+            directory: Directory of the cache files
+            max_bytes: Disk (and memory) budget of this worker's file
+            stale_ttl: Seconds an expired entry is kept for stale reads
+        """
+        self.directory = Path(directory or settings.LOCAL_CACHE_DIR or Path(tempfile.gettempdir()) / "weather-api-cache")
+        self.max_bytes = max_bytes if max_bytes is not None else settings.LOCAL_CACHE_MAX_BYTES
+        self.stale_ttl = stale_ttl if stale_ttl is not None else settings.LOCAL_CACHE_STALE_TTL
+        self.path: Optional[Path] = None
+        self._index: Dict[str, Tuple[float, str]] = {}
+        self._file = None
+        self._size = 0
+        self._pid = None
+        # Guards the index, shared by the event loop and the writer thread
+        self._lock = threading.Lock()
+        # One thread, so lines are written in the order of the calls
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    def _ensure_writer(self) -> ThreadPoolExecutor:
+        # Created lazily in the worker process, after a possible fork
+        if self._writer is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            # The writer thread of a parent process does not survive a fork, its lock might
+            self._lock = threading.Lock()
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-cache")
+            self._file = None
+        return self._writer
+
+    def _ensure_open(self):
+        if self._file is not None and self._pid == os.getpid():
+            return
+        # Loaded by the writer thread, after the writes already queued
+        self._ensure_writer().submit(self._open).result()
+
+    async def open(self):
+        """Load the file and merge orphans without blocking the event loop, e.g. during warm-up"""
+        if self._file is not None and self._pid == os.getpid():
+            return
+        await asyncio.get_running_loop().run_in_executor(self._ensure_writer(), self._open)
+
+    def _open(self):
+        """Open this worker's file and rebuild the index, in the writer thread"""
+        if self._file is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"cache-{self._pid}.log"
+        file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._index = {}
+        self._load(self.path)
+        self._merge_orphans()
+        # Readers wait until the index is complete
+        self._file = file
+        self._compact()
+
+    def _load(self, path: Path):
+        """Replay a cache file into the index"""
+        now = time.time()
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    key, expires_at, value = json.loads(line)
+                except ValueError:
+                    # Truncated last line of a worker killed mid-write
+                    continue
+                if value is None:
+                    self._index.pop(key, None)
+                elif expires_at + self.stale_ttl > now:
+                    current = self._index.get(key)
+                    if current is None or current[0] <= expires_at:
+                        self._index[key] = (expires_at, value)
+
+    def _merge_orphans(self):
+        """Merge the files of workers that are no longer running"""
+        if fcntl is None:
+            return
+        for path in self.directory.glob("cache-*.log"):
+            if path == self.path:
+                continue
+            try:
+                with open(path, "rb") as f:
+                    # A live worker holds the lock on its own file
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    self._load(path)
+                    path.unlink()
+            except OSError:
+                continue
+
+    def _compact(self):
+        """Rewrite the file with the live entries only, evicting the oldest beyond the budget"""
+        now = time.time()
+        with self._lock:
+            snapshot = list(self._index.items())
+        entries = sorted(
+            ((key, entry) for key, entry in snapshot if entry[0] + self.stale_ttl > now),
+            key=lambda item: item[1][0],
+            reverse=True
+        )
+        kept, lines, size = set(), [], 0
+        # Keep half the budget free so compaction does not run on every write
+        for key, (expires_at, value) in entries:
+            line = json.dumps([key, expires_at, value]).encode() + b"\n"
+            if size + len(line) > self.max_bytes // 2:
+                break
+            kept.add(key)
+            lines.append(line)
+            size += len(line)
+
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        self._size = size
+        with self._lock:
+            # Entries written since the snapshot are appended after this rewrite
+            for key, entry in snapshot:
+                if key not in kept and self._index.get(key) is entry:
+                    del self._index[key]
+
+    def _write(self, line: bytes):
+        """Append a line to the file, in the writer thread"""
+        self._file.write(line)
+        self._file.flush()
+        self._size += len(line)
+        if self._size > self.max_bytes:
+            self._compact()
+
+    def _append(self, key: str, expires_at: float, value: Optional[str]):
+        line = json.dumps([key, expires_at, value]).encode() + b"\n"
+        self._writer.submit(self._write, line)
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[str]:
+        """Get a value, optionally even if it has expired"""
+        self._ensure_open()
+        with self._lock:
+            entry = self._index.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if not allow_stale and expires_at <= time.time():
+            return None
+        return value
+
+    def set(self, key: str, value: str, ex: Optional[int] = None):
+        """Set a value with an expiration in seconds"""
+        self._ensure_open()
+        expires_at = time.time() + (ex if ex is not None else settings.CACHE_EXPIRATION)
+        with self._lock:
+            self._index[key] = (expires_at, value)
+        self._append(key, expires_at, value)
+
+    def delete(self, key: str):
+        """Delete a value"""
+        self._ensure_open()
+        with self._lock:
+            deleted = self._index.pop(key, None) is not None
+        if deleted:
+            self._append(key, 0, None)
+
+    def delete_matching(self, pattern: str):
+        """Delete every key matching a glob pattern"""
+        self._ensure_open()
+        with self._lock:
+            keys = [key for key in self._index if fnmatch.fnmatchcase(key, pattern)]
+        for key in keys:
+            self.delete(key)
+
+    def items(self):
+        """Iterate over the (key, (expires_at, value)) entries, including stale ones"""
+        self._ensure_open()
+        with self._lock:
+            return list(self._index.items())
+
+    def flush(self):
+        """Wait until every pending write has reached the file"""
+        if self._writer is not None and self._pid == os.getpid():
+            self._writer.submit(lambda: None).result()
+
+    def close(self):
+        """Write the pending lines and close the file"""
+        if self._writer is not None and self._pid == os.getpid():
+            self._writer.shutdown(wait=True)
+        self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
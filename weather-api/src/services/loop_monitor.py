@@ -0,0 +1,96 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from src.middleware.prometheus import track_loop_lag, track_slow_callback
+from config.settings import settings
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        slow_callback_threshold: Optional[float] = None
+    ):
+        """
+        Measure how late the event loop runs a timer scheduled every
+        `interval` seconds. A busy or blocked loop delays every callback,
+        so this lag is the queueing delay every request is paying.
+
+        A watchdog thread checks the timer keeps ticking. When the loop has
+        been stuck in one callback for more than `slow_callback_threshold`
+        seconds, it prints the loop thread's stack once, which points at
+        the blocking code, like asyncio debug mode but without its
+        per-callback overhead.
+
+        Args:
+            interval: Seconds between lag measurements
+            slow_callback_threshold: Seconds of blocking before the stack is printed (0 disables the watchdog)
+        """
+        self.interval = interval if interval is not None else settings.LOOP_LAG_INTERVAL
+        self.slow_callback_threshold = (
+            slow_callback_threshold if slow_callback_threshold is not None
+            else settings.LOOP_SLOW_CALLBACK_THRESHOLD
+        )
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        # time.monotonic() of the last tick, written by the loop, read by the watchdog
+        self._heartbeat = 0.0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - start - self.interval)
+            track_loop_lag(self.lag)
+
+    def _watch(self):
+        """Watchdog thread: print the loop stack when a callback blocks it"""
+        reported = None
+        while not self._stopped.wait(self.slow_callback_threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            # One report per stall, identified by its last heartbeat
+            if blocked < self.slow_callback_threshold or heartbeat == reported:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            reported = heartbeat
+            track_slow_callback()
+            stack = "".join(traceback.format_stack(frame))
+            print(f"Event loop blocked for {blocked:.3f}s, stack of the running callback:\n{stack}")
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self._watchdog is None and self.slow_callback_threshold > 0:
+            self._loop_thread_id = threading.get_ident()
+            self._heartbeat = time.monotonic()
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._stopped.set()
+            self._watchdog.join()
+            self._watchdog = None
+        self.lag = 0.0
+
+# Singleton instance
+loop_lag_monitor = LoopLagMonitor()
@@ -0,0 +1,69 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.middleware.prometheus import track_negative_cache_hit
+
+from config.settings import settings
+
+# Reasons of a negative entry
+UNKNOWN_LOCATION = "unknown_location"
+UPSTREAM_FAILURE = "upstream_failure"
+
+class NegativeCache:
+    def __init__(self, ttls: Optional[Dict[str, int]] = None, max_entries: Optional[int] = None):
+        """
+        Short-lived in-process memory of lookups that produced nothing.
+
+        An unknown location holds for every data type, an upstream failure
+        only for the data type that failed. Entries are checked before Redis,
+        so a repeated miss costs neither a Redis round-trip nor an upstream call.
+
+        Args:
+            ttls: TTL in seconds per reason
+            max_entries: Maximum number of entries, the oldest are evicted first
+        """
+        self.ttls = ttls if ttls is not None else {
+            UNKNOWN_LOCATION: settings.NEGATIVE_CACHE_TTL_UNKNOWN,
+            UPSTREAM_FAILURE: settings.NEGATIVE_CACHE_TTL_FAILURE,
+        }
+        self.max_entries = max_entries if max_entries is not None else settings.NEGATIVE_CACHE_MAX_ENTRIES
+        # (data type or None for every type, city) -> (expires_at, reason)
+        self._entries: "OrderedDict[Tuple[Optional[str], str], Tuple[float, str]]" = OrderedDict()
+
+    def _get(self, key: Tuple[Optional[str], str], now: float) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        return entry[1]
+
+    def check(self, data_type: str, city: str) -> Optional[str]:
+        """Return the reason if the lookup is known to produce nothing, else None"""
+        if not self._entries:
+            return None
+        now = time.monotonic()
+        city = city.lower()
+        reason = self._get((None, city), now) or self._get((data_type, city), now)
+        if reason:
+            track_negative_cache_hit(data_type, reason)
+        return reason
+
+    def add(self, data_type: Optional[str], city: str, reason: str):
+        """Remember a lookup that produced nothing; data_type None applies to every type"""
+        ttl = self.ttls.get(reason, 0)
+        if ttl <= 0:
+            return
+        key = (data_type, city.lower())
+        self._entries[key] = (time.monotonic() + ttl, reason)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def add_unknown(self, city: str):
+        self.add(None, city, UNKNOWN_LOCATION)
+
+    def add_failure(self, data_type: str, city: str):
+        self.add(data_type, city, UPSTREAM_FAILURE)
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# Conversion factors of wind speed units to m/s
+WIND_SPEED_TO_MS = {
+    "m/s": 1.0,
+    "km/h": 1 / 3.6,
+    "mph": 0.44704,
+    "kn": 0.514444,
+}
+
+def wind_speed_ms(speed: Optional[float], unit: str = "m/s") -> Optional[float]:
+    """Convert a wind speed to m/s"""
+    if speed is None:
+        return None
+    return speed * WIND_SPEED_TO_MS.get(unit, 1.0)
+
+@dataclass(slots=True)
+class ProviderObservation:
+    """
+    Current conditions reported by one provider, normalized by its adapter
+    (celsius, hPa, m/s, degrees). Internal only: the API models are built
+    from the aggregate in WeatherService.
+    """
+    source: str
+    temperature: Optional[float] = None
+    humidity: Optional[float] = None
+    pressure: Optional[float] = None
+    wind_speed: Optional[float] = None
+    wind_direction: Optional[float] = None
+    condition: Optional[str] = None
+    description: Optional[str] = None
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.middleware.prometheus import track_external_api_call
+from src.services.http_client import parse_json
+from src.services.provider_registry import BulkheadFull, ProviderBulkhead
+from src.services.deadline import DeadlineExceeded, get_deadline
+
+from config.settings import settings
+
+class OpenMeteoBatcher:
+    def __init__(
+        self,
+        base_url: str,
+        params: Dict[str, str],
+        bulkhead: ProviderBulkhead,
+        window: Optional[float] = None,
+        max_size: Optional[int] = None
+    ):
+        """
+        Dataloader-style batching of Open-Meteo /forecast calls.
+
+        Locations requested within `window` seconds are fetched with a
+        single multi-location request (comma-separated latitudes and
+        longitudes) and each caller gets the entry for its own location.
+
+        Args:
+            base_url: Open-Meteo API base URL
+            params: Query parameters shared by every location
+            bulkhead: Open-Meteo bulkhead, one slot is held per request
+            window: Seconds to wait for other locations before sending the request
+            max_size: Maximum number of locations per request
+        """
+        self.base_url = base_url
+        self.params = params
+        self.bulkhead = bulkhead
+        self.window = window if window is not None else settings.OPEN_METEO_BATCH_WINDOW
+        self.max_size = max_size if max_size is not None else settings.OPEN_METEO_BATCH_MAX_SIZE
+        # (location, caller future, caller deadline)
+        self._queue: List[Tuple[Tuple[float, float], asyncio.Future, Optional[float]]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._dispatch_tasks = set()
+
+    async def load(self, coords: Dict[str, float]) -> Dict[str, Any]:
+        """Get the Open-Meteo response for one location"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append(((coords["lat"], coords["lon"]), future, get_deadline()))
+
+        if len(self._queue) >= self.max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queue = self._queue, []
+        if batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+
+    def _timeout(self, batch) -> float:
+        """Provider timeout, up to the latest deadline of the callers still waiting"""
+        deadlines = [deadline for _, _, deadline in batch]
+        if None in deadlines:
+            return settings.PROVIDER_TIMEOUT
+        left = max(deadlines) - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceeded("Request deadline exceeded")
+        return min(settings.PROVIDER_TIMEOUT, left)
+    
+    async def _dispatch(self, batch: List[Tuple[Tuple[float, float], asyncio.Future, Optional[float]]]):
+        """Send one request for the whole batch and resolve every waiting caller"""
+        # Callers of abandoned requests have been cancelled already
+        batch = [entry for entry in batch if not entry[1].done()]
+        if not batch:
+            return
+        # Several callers may wait for the same location
+        locations = list(dict.fromkeys(location for location, _, _ in batch))
+        params = {
+            **self.params,
+            "latitude": ",".join(str(lat) for lat, _ in locations),
+            "longitude": ",".join(str(lon) for _, lon in locations),
+        }
+
+        try:
+            timeout = self._timeout(batch)
+        except DeadlineExceeded as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        
+        try:
+            async with self.bulkhead.slot():
+                response = await self.bulkhead.client.get(f"{self.base_url}/forecast", params=params, timeout=timeout)
+            response.raise_for_status()
+            data = parse_json(response, "open_meteo")
+            # A single location is returned as an object, several as a list
+            results = data if isinstance(data, list) else [data]
+            if len(results) != len(locations):
+                raise ValueError(f"Open-Meteo returned {len(results)} locations, {len(locations)} requested")
+            by_location = dict(zip(locations, results))
+            # Track successful API call
+            track_external_api_call("open_meteo", success=True)
+        except asyncio.CancelledError:
+            # Shutting down: the callers must not wait for their deadline
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            # Track failed API call (a full bulkhead made no call)
+            if not isinstance(e, BulkheadFull):
+                track_external_api_call("open_meteo", success=False)
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for location, future, _ in batch:
+            if not future.done():
+                future.set_result(by_location[location])
+
+    async def close(self):
+        """Cancel the pending flush and the requests in flight, and their callers"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queue = self._queue, []
+        for _, future, _ in batch:
+            future.cancel()
+        for task in list(self._dispatch_tasks):
+            task.cancel()
+        await asyncio.gather(*self._dispatch_tasks, return_exceptions=True)
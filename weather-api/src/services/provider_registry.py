@@ -0,0 +1,128 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+import httpx
+
+from src.middleware.prometheus import track_provider_slot, track_provider_rejection, set_provider_limit
+from src.services.deadline import DeadlineExceeded, bounded_timeout
+
+from config.settings import settings
+
+class BulkheadFull(Exception):
+    """Raised when no provider slot frees up within the queue-wait timeout"""
+
+class ProviderBulkhead:
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        queue_timeout: float,
+        max_connections: int,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Isolation of one provider: at most `max_concurrency` calls in flight,
+        callers waiting at most `queue_timeout` seconds for a slot, and an
+        HTTP client with its own connection pool of `max_connections`.
+
+        A slow provider then fills its own slots and pool and fails fast,
+        instead of piling up coroutines and sockets shared with the others.
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.max_connections = max_connections
+        self._client = client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        set_provider_limit(name, max_concurrency)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client of this provider, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=settings.PROVIDER_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def _acquire(self, timeout: float):
+        """
+        Acquire a permit within `timeout`. Before Python 3.12, wait_for could
+        time out just as acquire() succeeded and drop that permit, so acquire
+        runs as its own task and a permit it got anyway is given back.
+        """
+        acquire = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            await asyncio.wait_for(asyncio.shield(acquire), timeout=timeout)
+        except BaseException:
+            if acquire.done() and not acquire.cancelled():
+                self._semaphore.release()
+            else:
+                acquire.cancel()
+            raise
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the provider slots for the duration of a call"""
+        start = time.perf_counter()
+        try:
+            # Waiting for a slot never outlasts the request deadline
+            timeout = bounded_timeout(self.queue_timeout)
+            await self._acquire(timeout)
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            track_provider_rejection(self.name)
+            raise BulkheadFull(f"{self.name}: no free slot after {time.perf_counter() - start:.3f}s")
+
+        self.in_flight += 1
+        track_provider_slot(self.name, in_flight=self.in_flight, queue_wait=time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            track_provider_slot(self.name, in_flight=self.in_flight)
+            self._semaphore.release()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+class ProviderRegistry:
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        """
+        Bulkheads of the weather providers.
+
+        Args:
+            limits: Per provider max_concurrency, queue_timeout and max_connections
+        """
+        limits = limits if limits is not None else settings.PROVIDER_BULKHEADS
+        self._bulkheads = {
+            name: ProviderBulkhead(
+                name,
+                max_concurrency=int(config["max_concurrency"]),
+                queue_timeout=config["queue_timeout"],
+                max_connections=int(config["max_connections"])
+            )
+            for name, config in limits.items()
+        }
+
+    def get(self, name: str) -> ProviderBulkhead:
+        return self._bulkheads[name]
+
+    def __iter__(self):
+        return iter(self._bulkheads.values())
+
+    async def close(self):
+        """Close the connection pools of every provider"""
+        for bulkhead in self._bulkheads.values():
+            await bulkhead.close()
+
+# Singleton instance
+provider_registry = ProviderRegistry()
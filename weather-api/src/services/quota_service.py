@@ -0,0 +1,89 @@
+from typing import Dict, Tuple, Optional
+
+from src.middleware.prometheus import track_api_quota_remaining
+from src.services.redis_service import RedisService, redis_service
+
+from config.settings import settings
+
+# Token bucket refilled continuously at `rate` tokens per second up to
+# `capacity`. The script runs atomically in Redis so every replica sharing
+# the same API key draws from the same bucket. Redis server time is used so
+# replicas with skewed clocks still agree on the refill.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+class QuotaManager:
+    def __init__(self, redis_service: RedisService, quotas: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Cluster-wide upstream quota limiter.
+
+        Args:
+            redis_service: Redis service holding the shared buckets
+            quotas: Mapping of provider name to (capacity, refill rate per second)
+        """
+        self.redis_service = redis_service
+        if quotas is None:
+            quotas = {
+                "openweather": (settings.OPENWEATHER_QUOTA_PER_MINUTE, settings.OPENWEATHER_QUOTA_PER_MINUTE / 60),
+                "weatherapi": (settings.WEATHERAPI_QUOTA_PER_MINUTE, settings.WEATHERAPI_QUOTA_PER_MINUTE / 60),
+            }
+        self.quotas = quotas
+        self._script = None
+        self._script_client = None
+
+    def _get_script(self, client):
+        # Register the script once per client; redis-py then calls it with
+        # EVALSHA and falls back to EVAL if the script cache was flushed
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            self._script_client = client
+        return self._script
+
+    async def acquire(self, provider: str, tokens: int = 1) -> bool:
+        """
+        Take tokens from the provider bucket.
+
+        Returns False when the provider budget is exhausted. When Redis is not
+        available the call is allowed, since the upstream quota is then the
+        only limit left.
+        """
+        if provider not in self.quotas:
+            return True
+        capacity, rate = self.quotas[provider]
+
+        client = await self.redis_service.get_redis()
+        if not client:
+            return True
+
+        try:
+            script = self._get_script(client)
+            allowed, remaining = await script(keys=[f"quota:{provider}"], args=[capacity, rate, tokens])
+        except Exception as e:
+            print(f"Quota check error: {e}")
+            return True
+
+        track_api_quota_remaining(provider, float(remaining))
+        return bool(int(allowed))
+
+# Singleton instance
+quota_manager = QuotaManager(redis_service)
@@ -1,14 +1,25 @@
+import asyncio
 import redis.asyncio as redis
 from typing import Optional, Any
 import json
 from fastapi import Depends
 
+from src.services.local_cache import LocalCache
+
 from config.settings import settings
 
 class RedisService:
-    def __init__(self):
-        """Initialize Redis connection if URL is provided in settings"""
+    def __init__(self, local_cache: Optional[LocalCache] = None):
+        """
+        Initialize Redis connection if URL is provided in settings.
+
+        Args:
+            local_cache: Optional local tier written through on every set and
+                read only when Redis is unavailable, so keys expired or
+                invalidated in Redis are never served from it
+        """
         self.redis_url = settings.REDIS_URL
+        self.local_cache = local_cache
         self._redis_client = None
         
     async def get_redis(self) -> Optional[redis.Redis]:
@@ -28,19 +39,30 @@ class RedisService:
         return self._redis_client
         
     async def get(self, key: str) -> Optional[str]:
-        """Get value from Redis"""
+        """Get value from Redis, or from the local cache while Redis is unavailable"""
         client = await self.get_redis()
-        if not client:
-            return None
+        if client:
+            try:
+                # A miss is authoritative: the key expired or was invalidated
+                return await client.get(key)
+            except Exception as e:
+                print(f"Redis get error: {e}")
+                
+        if self.local_cache is not None:
+            return self.local_cache.get(key)
+        return None
             
-        try:
-            return await client.get(key)
-        except Exception as e:
-            print(f"Redis get error: {e}")
+    async def get_stale(self, key: str) -> Optional[str]:
+        """Get a value from the local cache even if it has expired"""
+        if self.local_cache is None:
             return None
+        return self.local_cache.get(key, allow_stale=True)
             
     async def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
         """Set value in Redis with optional expiration in seconds"""
+        if self.local_cache is not None:
+            self.local_cache.set(key, value, ex=ex)
+            
         client = await self.get_redis()
         if not client:
             return False
@@ -52,8 +74,25 @@ class RedisService:
             print(f"Redis set error: {e}")
             return False
             
+    async def ttl(self, key: str) -> Optional[int]:
+        """Remaining TTL of a key in seconds, None if unknown"""
+        client = await self.get_redis()
+        if not client:
+            return None
+            
+        try:
+            ttl = await client.ttl(key)
+            # -1: no expiry, -2: no such key
+            return ttl if ttl >= 0 else None
+        except Exception as e:
+            print(f"Redis ttl error: {e}")
+            return None
+            
     async def delete(self, key: str) -> bool:
         """Delete key from Redis"""
+        if self.local_cache is not None:
+            self.local_cache.delete(key)
+            
         client = await self.get_redis()
         if not client:
             return False
@@ -65,6 +104,82 @@ class RedisService:
             print(f"Redis delete error: {e}")
             return False
             
+    async def delete_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """
+        Delete every key matching a glob pattern and return how many were deleted.
+        
+        Keys are found with incremental SCAN, never KEYS, and unlinked in
+        pipelined batches (UNLINK frees the memory in a background thread),
+        so Redis keeps serving other clients meanwhile.
+        """
+        if self.local_cache is not None:
+            self.local_cache.delete_matching(pattern)
+            
+        client = await self.get_redis()
+        if not client:
+            return 0
+            
+        deleted = 0
+        batch = []
+        try:
+            async for key in client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await self._unlink(client, batch)
+                    batch = []
+            if batch:
+                deleted += await self._unlink(client, batch)
+        except Exception as e:
+            print(f"Redis delete pattern error: {e}")
+        return deleted
+        
+    async def _unlink(self, client, keys) -> int:
+        async with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.unlink(key)
+            return sum(await pipe.execute())
+        
+    async def prefill_local_cache(self, pattern: str = "weather:*", limit: Optional[int] = None) -> int:
+        """Copy up to `limit` Redis entries matching `pattern` into the local cache"""
+        limit = limit if limit is not None else settings.LOCAL_CACHE_PREFILL_LIMIT
+        if self.local_cache is not None:
+            # A large file is loaded off the event loop
+            await self.local_cache.open()
+        client = await self.get_redis()
+        if not client or self.local_cache is None or limit <= 0:
+            return 0
+            
+        keys = []
+        async for key in client.scan_iter(match=pattern, count=500):
+            keys.append(key)
+            if len(keys) >= limit:
+                break
+        if not keys:
+            return 0
+            
+        async with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+                pipe.ttl(key)
+            replies = await pipe.execute()
+            
+        count = 0
+        for key, value, ttl in zip(keys, replies[::2], replies[1::2]):
+            # The key may have expired between the scan and the read
+            if value is not None and ttl > 0:
+                self.local_cache.set(key, value, ex=ttl)
+                count += 1
+        return count
+        
+    async def close(self):
+        """Close the Redis connection pool and the local cache file"""
+        if self._redis_client is not None:
+            await self._redis_client.aclose()
+            self._redis_client = None
+        if self.local_cache is not None:
+            # Waits for the pending local writes
+            await asyncio.to_thread(self.local_cache.close)
+            
     async def health_check(self) -> bool:
         """Check if Redis is healthy"""
         client = await self.get_redis()
@@ -78,7 +193,7 @@ class RedisService:
             return False
 
 # Singleton instance
-redis_service = RedisService()
+redis_service = RedisService(LocalCache() if settings.LOCAL_CACHE_ENABLED else None)
 
 # Dependency for FastAPI
 async def get_redis_service() -> RedisService:
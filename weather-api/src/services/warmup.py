@@ -0,0 +1,64 @@
+import asyncio
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+from src.services.geocoding_service import load_city_coordinates
+from src.services.health_service import HealthService, PROVIDER_PING_URLS
+from src.services.redis_service import RedisService
+
+from config.settings import settings
+
+async def _resolve(host: str, port: int):
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.getaddrinfo(host, port)
+    except OSError as e:
+        print(f"DNS resolution error for {host}: {e}")
+
+async def resolve_upstream_hosts():
+    """Resolve the provider and Redis host names concurrently so the OS resolver cache is warm"""
+    urls = [*PROVIDER_PING_URLS.values()]
+    if settings.REDIS_URL:
+        urls.append(settings.REDIS_URL)
+
+    hosts = set()
+    for url in urls:
+        parsed = urlparse(url)
+        if parsed.hostname:
+            hosts.add((parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80)))
+    await asyncio.gather(*(_resolve(host, port) for host, port in hosts))
+
+async def warm_up(redis_service: RedisService, health_service: HealthService) -> Dict[str, float]:
+    """
+    Prepare a freshly started process to serve traffic.
+
+    Loads the city data, pre-resolves DNS, opens the Redis connection, copies
+    recent Redis entries into the local cache and opens the connection
+    pool of each provider in the registry (the health probes ping every
+    provider through its own bulkhead client). Each network step is bounded by WARMUP_TIMEOUT so a
+    down dependency cannot block the start. Returns the duration of each step.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    load_city_coordinates()
+    timings["city_data"] = time.perf_counter() - start
+
+    # Coroutines are created when their step runs, after the previous ones
+    steps = [
+        ("dns", resolve_upstream_hosts),
+        ("redis", redis_service.get_redis),
+        ("local_cache", redis_service.prefill_local_cache),
+        ("connection_pools", health_service.refresh),
+    ]
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(step(), timeout=settings.WARMUP_TIMEOUT)
+        except Exception as e:
+            print(f"Warm-up step {name} failed: {e!r}")
+        timings[name] = time.perf_counter() - start
+
+    print(f"Warm-up done: { {name: round(seconds, 3) for name, seconds in timings.items()} }")
+    return timings
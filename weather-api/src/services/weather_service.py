@@ -1,294 +1,553 @@
-import httpx
-from typing import Dict, Any, List, Optional
+from typing import Dict, AsyncIterator, FrozenSet, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 import asyncio
-from fastapi import Depends
+import random
 
-from src.middleware.prometheus import track_external_api_call
-from src.services.redis_service import RedisService, get_redis_service
+from src.middleware.prometheus import (
+    track_external_api_call,
+    track_cache_lookup,
+    track_cache_decode_error,
+    track_cache_write,
+    track_cache_hit_ttl
+)
+from src.services.redis_service import RedisService
+from src.services.quota_service import QuotaManager
+from src.services.aggregation import aggregation_engine
+from src.services.observation import ProviderObservation, wind_speed_ms
+from src.services.geocoding_service import get_city_coordinates
+from src.services.http_client import parse_json
+from src.services.provider_registry import ProviderRegistry, provider_registry as default_provider_registry
+from src.services.cache_policy import ttl_policy
+from src.services.open_meteo_batcher import OpenMeteoBatcher
+from src.services.negative_cache import NegativeCache
+from src.services.deadline import bounded_timeout, expired
+from src.services.load_shedding import Overloaded, is_stale_only
+from src.services.field_selection import PROVIDERS, current_cache_key, plan_providers
 
 from config.settings import settings
 from src.schemas.weather import CurrentWeather, Forecast, HistoricalWeather, Temperature, Wind, WeatherCondition, ForecastItem
 
+# Open-Meteo current variables read by the adapter
+OPEN_METEO_CURRENT_FIELDS = (
+    "temperature_2m",
+    "relative_humidity_2m",
+    "pressure_msl",
+    "wind_speed_10m",
+    "wind_direction_10m",
+    "weather_code",
+)
+
 class WeatherService:
-    def __init__(self, redis_service: RedisService = Depends(get_redis_service)):
+    def __init__(
+        self,
+        redis_service: RedisService,
+        quota_manager: Optional[QuotaManager] = None,
+        negative_cache: Optional[NegativeCache] = None,
+        provider_registry: Optional[ProviderRegistry] = None
+    ):
+        """
+        Aggregates weather data from several providers. A single instance is
+        shared by all requests (see src/services/container.py).
+        """
         self.open_meteo_base_url = settings.OPEN_METEO_BASE_URL
         self.openweather_api_key = settings.OPENWEATHER_API_KEY
         self.weatherapi_key = settings.WEATHERAPI_KEY
         self.redis_service = redis_service
-        
-        # Simple city coordinates mapping for testing
-        # In a real app, you'd use a geocoding service
-        self.city_coordinates = {
-            "paris": {"lat": 48.8566, "lon": 2.3522},
-            "london": {"lat": 51.5074, "lon": -0.1278},
-            "new york": {"lat": 40.7128, "lon": -74.0060},
-            "tokyo": {"lat": 35.6762, "lon": 139.6503},
-            "sydney": {"lat": -33.8688, "lon": 151.2093},
-            "berlin": {"lat": 52.5200, "lon": 13.4050},
-            "madrid": {"lat": 40.4168, "lon": -3.7038},
-            "rome": {"lat": 41.9028, "lon": 12.4964},
-        }
+        self.quota_manager = quota_manager or QuotaManager(redis_service)
+        # Unknown cities and failed aggregations, checked before Redis
+        self.negative_cache = negative_cache or NegativeCache()
+        # Concurrency limit and connection pool of each provider
+        self.providers = provider_registry or default_provider_registry
+        self.open_meteo_batcher = OpenMeteoBatcher(
+            self.open_meteo_base_url,
+            # Only the current values we read, not a week of hourly series
+            params={"current": ",".join(OPEN_METEO_CURRENT_FIELDS)},
+            bulkhead=self.providers.get("open_meteo")
+        )
+        # Late provider calls completing after an early response
+        self._background_tasks: Set[asyncio.Task] = set()
     
     def _get_city_coordinates(self, city: str) -> Optional[Dict[str, float]]:
         """Get coordinates for a city from our simple mapping"""
-        return self.city_coordinates.get(city.lower())
+        return get_city_coordinates(city)
     
-    async def get_current_weather(self, city: str) -> Optional[CurrentWeather]:
+    async def get_current_weather(self, city: str, fields: Optional[FrozenSet[str]] = None) -> Optional[CurrentWeather]:
         """
-        Get current weather for a city by aggregating data from multiple sources
+        Get current weather for a city by aggregating data from multiple sources.
+        With `fields`, only the providers needed for them are called.
         """
+        if self.negative_cache.check("current", city):
+            return None
+        
         # Try to get from cache first
-        cache_key = f"weather:current:{city.lower()}"
+        providers = plan_providers(fields)
+        cache_key = current_cache_key(city, providers)
+        cached = await self._get_cached_current_for(city, providers)
+        if cached:
+            return cached
+        
+        # Unknown cities are a 404 even when shedding load, never a retryable 503
+        coords = self._get_city_coordinates(city)
+        print(f"Coordinates for {city}: {coords}")
+        if not coords:
+            print(f"No coordinates found for {city}")
+            self.negative_cache.add_unknown(city)
+            return None
+        
+        if is_stale_only():
+            return await self._get_stale_current_for(city, providers)
+        
+        valid_results, pending = await self._fetch_current_results(city, coords, endpoint="current", providers=providers)
+        
+        # Aggregate the results
+        result = self._aggregate_current_weather(valid_results, city, coords)
+        print(f"Aggregated result: {result}")
+        
+        # Cache the result if we have valid data
+        if result and valid_results:
+            await self._cache_current(cache_key, result, partial=bool(pending))
+        elif not pending and not expired() and providers == PROVIDERS:
+            # Every provider failed: do not retry all of them on the next request
+            self.negative_cache.add_failure("current", city)
+        
+        # Late providers upgrade the cached aggregate once they answer
+        if pending:
+            self._complete_in_background(pending, valid_results, city, coords, cache_key)
+        
+        return result
+    
+    async def get_current_weather_batch(
+        self,
+        cities: List[str],
+        fields: Optional[FrozenSet[str]] = None
+    ) -> List[Optional[CurrentWeather]]:
+        """
+        Get current weather for many cities. Cache misses are fetched
+        concurrently and aggregated together.
+        Unknown cities are returned as None.
+        """
+        weather: List[Optional[CurrentWeather]] = [None] * len(cities)
+        providers = plan_providers(fields)
+        cache_keys = [current_cache_key(city, providers) for city in cities]
+        lookups = [i for i, city in enumerate(cities) if not self.negative_cache.check("current", city)]
+        cached = await asyncio.gather(*(self._get_cached_current_for(cities[i], providers) for i in lookups))
+        for i, result in zip(lookups, cached):
+            weather[i] = result
+        
+        if is_stale_only():
+            # Shedding load: misses are answered from stale entries or left out
+            for i in lookups:
+                if weather[i] is None:
+                    try:
+                        weather[i] = await self._get_stale_current_for(cities[i], providers)
+                    except Overloaded:
+                        pass
+            return weather
+        
+        misses = []
+        for i in lookups:
+            if weather[i] is None:
+                coords = self._get_city_coordinates(cities[i])
+                if coords:
+                    misses.append((i, cities[i], coords))
+                else:
+                    self.negative_cache.add_unknown(cities[i])
+        
+        if misses:
+            fetches = await asyncio.gather(
+                *(self._fetch_current_results(city, coords, endpoint="current_batch", providers=providers)
+                  for _, city, coords in misses)
+            )
+            fetched = [(i, city, coords, results, pending) for (i, city, coords), (results, pending) in zip(misses, fetches)]
+            with_results = [entry for entry in fetched if entry[3]]
+            aggregated = self._aggregate_current_weather_batch(
+                [results for _, _, _, results, _ in with_results],
+                [city for _, city, _, _, _ in with_results],
+                [coords for _, _, coords, _, _ in with_results]
+            )
+            for (i, _, _, _, pending), result in zip(with_results, aggregated):
+                if result:
+                    weather[i] = result
+                    await self._cache_current(cache_keys[i], result, partial=bool(pending))
+            for i, city, coords, results, pending in fetched:
+                if pending:
+                    self._complete_in_background(pending, results, city, coords, cache_keys[i])
+                elif weather[i] is None and providers == PROVIDERS:
+                    self.negative_cache.add_failure("current", city)
+        
+        return weather
+    
+    async def _get_cached(self, cache_key: str, model):
+        """Read a cached entry and parse it as the given model"""
+        data_type = cache_key.split(":")[1]
         try:
             cached_data = await self.redis_service.get(cache_key)
             if cached_data:
                 try:
-                    return CurrentWeather.model_validate_json(cached_data)
+                    result = model.model_validate_json(cached_data)
+                    track_cache_lookup(data_type, hit=True, size=len(cached_data))
+                    if random.random() < settings.CACHE_TTL_SAMPLE_RATE:
+                        self._sample_ttl(cache_key, data_type)
+                    return result
                 except Exception as e:
                     print(f"Cache parsing error: {e}")
+                    track_cache_decode_error(data_type)
                     # Continue if parsing fails
                     pass
         except Exception as e:
             print(f"Cache read error: {e}")
             # Continue if cache read fails
             pass
-                
-        coords = self._get_city_coordinates(city)
-        print(f"Coordinates for {city}: {coords}")
-        if not coords:
-            print(f"No coordinates found for {city}")
-            return None
+        track_cache_lookup(data_type, hit=False)
+        return None
+    
+    async def _get_stale(self, cache_key: str, model):
+        """
+        Entry kept past its expiry, used while shedding load. Raises
+        Overloaded when there is none, rather than calling the providers.
+        """
+        try:
+            cached_data = await self.redis_service.get_stale(cache_key)
+            if cached_data:
+                return model.model_validate_json(cached_data)
+        except Exception as e:
+            print(f"Stale cache read error: {e}")
+        raise Overloaded()
+    
+    def _sample_ttl(self, cache_key: str, data_type: str):
+        """Record the remaining TTL of a hit, off the request path"""
+        async def sample():
+            try:
+                ttl = await self.redis_service.ttl(cache_key)
+                if ttl is not None:
+                    track_cache_hit_ttl(data_type, ttl)
+            except Exception as e:
+                print(f"Cache TTL sampling error: {e}")
         
-        # Call all weather APIs concurrently
-        tasks = [
-            self._get_open_meteo_current(city, coords),
-            self._get_openweather_current(city),
-            self._get_weatherapi_current(city)
-        ]
+        task = asyncio.create_task(sample())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _cache(self, cache_key: str, result, ttl: int):
+        """Write an entry to the cache"""
+        data_type = cache_key.split(":")[1]
+        try:
+            value = result.model_dump_json()
+            written = await self.redis_service.set(cache_key, value, ex=ttl)
+            track_cache_write(data_type, success=bool(written), size=len(value))
+            print(f"Result cached with key {cache_key} for {ttl}s")
+        except Exception as e:
+            print(f"Cache write error: {e}")
+            track_cache_write(data_type, success=False, size=0)
+    
+    async def _get_cached_current(self, cache_key: str) -> Optional[CurrentWeather]:
+        """Read an aggregated current weather from the cache"""
+        return await self._get_cached(cache_key, CurrentWeather)
+    
+    async def _get_cached_current_for(self, city: str, providers: Tuple[str, ...]) -> Optional[CurrentWeather]:
+        """
+        Cached current weather covering the planned providers: the full
+        aggregate serves every field subset, then the entry of the plan.
+        """
+        cached = await self._get_cached_current(current_cache_key(city))
+        if cached is None and providers != PROVIDERS:
+            cached = await self._get_cached_current(current_cache_key(city, providers))
+        return cached
+    
+    async def _get_stale_current_for(self, city: str, providers: Tuple[str, ...]) -> CurrentWeather:
+        """Stale current weather covering the planned providers, see _get_stale"""
+        if providers != PROVIDERS:
+            try:
+                return await self._get_stale(current_cache_key(city), CurrentWeather)
+            except Overloaded:
+                pass
+        return await self._get_stale(current_cache_key(city, providers), CurrentWeather)
+    
+    async def _cache_current(self, cache_key: str, result: CurrentWeather, partial: bool = False):
+        """
+        Write an aggregated current weather to the cache. A partial aggregate
+        (late providers still running) does not count towards city stability.
+        """
+        if partial:
+            ttl = ttl_policy.ttl_for("current")
+        else:
+            ttl = ttl_policy.ttl_for("current", city=result.city, temperature=result.temperature.current)
+        await self._cache(cache_key, result, ttl)
+    
+    async def _fetch_current_results(
+        self,
+        city: str,
+        coords: Dict[str, float],
+        endpoint: str = "current",
+        providers: Tuple[str, ...] = PROVIDERS
+    ) -> Tuple[List[ProviderObservation], Set[asyncio.Task]]:
+        """
+        Call the planned weather APIs concurrently and keep the valid results.
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        print(f"API results: {results}")
+        With a quorum configured for the endpoint, returns as soon as
+        `min_sources` providers have answered or the `latency_budget` has
+        elapsed (once at least one provider answered), together with the
+        provider calls still pending.
+        """
+        calls = {
+            "open_meteo": lambda: self._get_open_meteo_current(city, coords),
+            "openweather": lambda: self._get_openweather_current(city),
+            "weatherapi": lambda: self._get_weatherapi_current(city),
+        }
+        tasks = [asyncio.ensure_future(calls[provider]()) for provider in providers]
+        quorum = settings.QUORUM_SETTINGS.get(endpoint, {})
+        min_sources = min(int(quorum.get("min_sources", 0)), len(tasks))
+        latency_budget = quorum.get("latency_budget", 0)
         
-        # Filter out exceptions and None results
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + latency_budget if latency_budget else None
         valid_results = []
-        for result in results:
-            if not isinstance(result, Exception) and result is not None:
-                valid_results.append(result)
-            elif isinstance(result, Exception):
-                print(f"API error: {result}")
+        pending = set(tasks)
         
-        print(f"Valid results: {valid_results}")
-        
-        # Aggregate the results
-        result = self._aggregate_current_weather(valid_results, city, coords)
-        print(f"Aggregated result: {result}")
+        try:
+            while pending:
+                if min_sources and len(valid_results) >= min_sources:
+                    break
+                timeout = None
+                if deadline is not None:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        if valid_results:
+                            break
+                        # Budget spent without any answer: wait for the first one
+                        timeout = None
+                
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                # Keep the providers order so the aggregate does not depend on timing
+                for task in tasks:
+                    if task in done:
+                        valid_results.extend(self._valid_results([task]))
+        except asyncio.CancelledError:
+            # The request was abandoned (client gone or deadline passed)
+            if settings.COMPLETE_ABANDONED_FETCHES:
+                self._complete_in_background(
+                    pending, valid_results, city, coords, current_cache_key(city, providers), cache_early=True
+                )
+            else:
+                for task in pending:
+                    task.cancel()
+            raise
         
-        # Cache the result if we have valid data
-        if result and valid_results:
-            # No try/except here to let the test verify the call
+        print(f"Valid results: {valid_results}")
+        return valid_results, pending
+    
+    def _valid_results(self, tasks) -> List[ProviderObservation]:
+        """Filter out exceptions and None results of finished provider calls"""
+        valid_results = []
+        for task in tasks:
+            if task.cancelled():
+                continue
+            if task.exception() is not None:
+                print(f"API error: {task.exception()}")
+            elif task.result() is not None:
+                valid_results.append(task.result())
+        return valid_results
+    
+    def _complete_in_background(
+        self,
+        pending: Set[asyncio.Task],
+        early_results: List[ProviderObservation],
+        city: str,
+        coords: Dict[str, float],
+        cache_key: str,
+        cache_early: bool = False
+    ):
+        """
+        Wait for late providers and cache the aggregate including them. With
+        cache_early the early results are cached even if every late provider fails.
+        """
+        async def complete():
             try:
-                await self.redis_service.set(
-                    cache_key,
-                    result.model_dump_json(),
-                    ex=300  # Cache for 5 minutes
-                )
-                print(f"Result cached with key {cache_key}")
-            except Exception as e:
-                print(f"Cache write error: {e}")
+                await asyncio.wait(pending)
+            except asyncio.CancelledError:
+                for task in pending:
+                    task.cancel()
+                raise
+            late_results = self._valid_results(pending)
+            if not late_results and not (cache_early and early_results):
+                return
+            result = self._aggregate_current_weather(early_results + late_results, city, coords)
+            if result:
+                await self._cache_current(cache_key, result)
         
-        return result
+        task = asyncio.create_task(complete())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
     
-    async def _get_open_meteo_current(self, city: str, coords: Dict[str, float]) -> Dict[str, Any]:
+    async def close(self):
+        """Cancel the background completions and batched Open-Meteo requests still running"""
+        for task in list(self._background_tasks):
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self.open_meteo_batcher.close()
+    
+    async def _get_open_meteo_current(self, city: str, coords: Dict[str, float]) -> ProviderObservation:
         """Get current weather from Open-Meteo API"""
-        async with httpx.AsyncClient() as client:
-            params = {
-                "latitude": coords["lat"],
-                "longitude": coords["lon"],
-                "current_weather": "true",
-                "hourly": "temperature_2m,relativehumidity_2m,pressure_msl,windspeed_10m,winddirection_10m"
-            }
-            
-            try:
-                response = await client.get(f"{self.open_meteo_base_url}/forecast", params=params)
-                response.raise_for_status()
-                data = response.json()
-                # Track successful API call
-                track_external_api_call("open_meteo", success=True)
-            except Exception as e:
-                # Track failed API call
-                track_external_api_call("open_meteo", success=False)
-                raise e
-            
-            # Extract current hour data from hourly data
-            current_hour_index = 0  # For simplicity, use first hour
-            
-            return {
-                "source": "open_meteo",
-                "temperature": {
-                    "current": data["current_weather"]["temperature"],
-                    "unit": "celsius"
-                },
-                "humidity": data["hourly"]["relativehumidity_2m"][current_hour_index] if "relativehumidity_2m" in data["hourly"] else None,
-                "wind": {
-                    "speed": data["current_weather"]["windspeed"],
-                    "direction": data["current_weather"]["winddirection"],
-                    "unit": "km/h"
-                },
-                "conditions": {
-                    "main": self._get_weather_condition_from_code(data["current_weather"]["weathercode"]),
-                    "description": self._get_weather_description_from_code(data["current_weather"]["weathercode"])
-                }
-            }
+        # Concurrent misses for different cities share one multi-location request
+        data = await self.open_meteo_batcher.load(coords)
+        
+        current = data["current"]
+        return ProviderObservation(
+            source="open_meteo",
+            temperature=current["temperature_2m"],
+            humidity=current.get("relative_humidity_2m"),
+            pressure=current.get("pressure_msl"),
+            wind_speed=wind_speed_ms(current["wind_speed_10m"], "km/h"),
+            wind_direction=current["wind_direction_10m"],
+            condition=self._get_weather_condition_from_code(current["weather_code"]),
+            description=self._get_weather_description_from_code(current["weather_code"])
+        )
     
-    async def _get_openweather_current(self, city: str) -> Dict[str, Any]:
+    async def _get_openweather_current(self, city: str) -> Optional[ProviderObservation]:
         """Get current weather from OpenWeatherMap API"""
         if not self.openweather_api_key:
             return None
-            
-        async with httpx.AsyncClient() as client:
-            params = {
-                "q": city,
-                "appid": self.openweather_api_key,
-                "units": "metric"
-            }
+        
+        bulkhead = self.providers.get("openweather")
+        # Never wait for a provider past the request deadline
+        timeout = bounded_timeout(settings.PROVIDER_TIMEOUT)
+        params = {
+            "q": city,
+            "appid": self.openweather_api_key,
+            "units": "metric"
+        }
+        
+        # Fails fast with BulkheadFull when the provider is saturated
+        async with bulkhead.slot():
+            # Quota is only spent once a slot guarantees the call is made.
+            # Skip the provider rather than hitting a 429 when the shared budget is spent
+            if not await self.quota_manager.acquire("openweather"):
+                print("openweather quota exhausted, skipping provider")
+                return None
             
             try:
-                response = await client.get("https://api.openweathermap.org/data/2.5/weather", params=params)
+                response = await bulkhead.client.get("https://api.openweathermap.org/data/2.5/weather", params=params, timeout=timeout)
                 response.raise_for_status()
-                data = response.json()
+                data = parse_json(response, "openweather")
                 # Track successful API call
                 track_external_api_call("openweather", success=True)
             except Exception as e:
                 # Track failed API call
                 track_external_api_call("openweather", success=False)
                 raise e
-            
-            return {
-                "source": "openweather",
-                "temperature": {
-                    "current": data["main"]["temp"],
-                    "feels_like": data["main"]["feels_like"],
-                    "min": data["main"]["temp_min"],
-                    "max": data["main"]["temp_max"],
-                    "unit": "celsius"
-                },
-                "humidity": data["main"]["humidity"],
-                "pressure": data["main"]["pressure"],
-                "wind": {
-                    "speed": data["wind"]["speed"],
-                    "direction": data["wind"].get("deg"),
-                    "unit": "m/s"
-                },
-                "conditions": {
-                    "main": data["weather"][0]["main"],
-                    "description": data["weather"][0]["description"],
-                    "icon": data["weather"][0]["icon"]
-                }
-            }
+        
+        return ProviderObservation(
+            source="openweather",
+            temperature=data["main"]["temp"],
+            humidity=data["main"]["humidity"],
+            pressure=data["main"]["pressure"],
+            wind_speed=data["wind"]["speed"],
+            wind_direction=data["wind"].get("deg"),
+            condition=data["weather"][0]["main"],
+            description=data["weather"][0]["description"]
+        )
     
-    async def _get_weatherapi_current(self, city: str) -> Dict[str, Any]:
+    async def _get_weatherapi_current(self, city: str) -> Optional[ProviderObservation]:
         """Get current weather from WeatherAPI.com"""
         if not self.weatherapi_key:
             return None
-            
-        async with httpx.AsyncClient() as client:
-            params = {
-                "q": city,
-                "key": self.weatherapi_key
-            }
+        
+        bulkhead = self.providers.get("weatherapi")
+        # Never wait for a provider past the request deadline
+        timeout = bounded_timeout(settings.PROVIDER_TIMEOUT)
+        params = {
+            "q": city,
+            "key": self.weatherapi_key,
+            "aqi": "no"  # skip the air quality block we do not use
+        }
+        
+        # Fails fast with BulkheadFull when the provider is saturated
+        async with bulkhead.slot():
+            # Quota is only spent once a slot guarantees the call is made.
+            # Skip the provider rather than hitting a 429 when the shared budget is spent
+            if not await self.quota_manager.acquire("weatherapi"):
+                print("weatherapi quota exhausted, skipping provider")
+                return None
             
             try:
-                response = await client.get("https://api.weatherapi.com/v1/current.json", params=params)
+                response = await bulkhead.client.get("https://api.weatherapi.com/v1/current.json", params=params, timeout=timeout)
                 response.raise_for_status()
-                data = response.json()
+                data = parse_json(response, "weatherapi")
                 # Track successful API call
                 track_external_api_call("weatherapi", success=True)
             except Exception as e:
                 # Track failed API call
                 track_external_api_call("weatherapi", success=False)
                 raise e
-            
-            return {
-                "source": "weatherapi",
-                "temperature": {
-                    "current": data["current"]["temp_c"],
-                    "feels_like": data["current"]["feelslike_c"],
-                    "unit": "celsius"
-                },
-                "humidity": data["current"]["humidity"],
-                "pressure": data["current"]["pressure_mb"],
-                "wind": {
-                    "speed": data["current"]["wind_kph"],
-                    "direction": data["current"]["wind_degree"],
-                    "unit": "km/h"
-                },
-                "conditions": {
-                    "main": data["current"]["condition"]["text"],
-                    "description": data["current"]["condition"]["text"],
-                    "icon": data["current"]["condition"]["icon"]
-                }
-            }
+        
+        return ProviderObservation(
+            source="weatherapi",
+            temperature=data["current"]["temp_c"],
+            humidity=data["current"]["humidity"],
+            pressure=data["current"]["pressure_mb"],
+            wind_speed=wind_speed_ms(data["current"]["wind_kph"], "km/h"),
+            wind_direction=data["current"]["wind_degree"],
+            condition=data["current"]["condition"]["text"],
+            description=data["current"]["condition"]["text"]
+        )
     
-    def _aggregate_current_weather(self, results: List[Dict[str, Any]], city: str, coords: Dict[str, float]) -> Optional[CurrentWeather]:
+    def _aggregate_current_weather(self, results: List[ProviderObservation], city: str, coords: Dict[str, float]) -> Optional[CurrentWeather]:
         """Aggregate weather data from multiple sources"""
         if not results:
             print("No valid results to aggregate")
             return None
-            
-        # Calculate average temperature
-        temps = [r["temperature"]["current"] for r in results if "temperature" in r]
-        avg_temp = sum(temps) / len(temps) if temps else None
         
-        if avg_temp is None:
-            print("No temperature data available")
+        # One city: the plain loop, the NumPy setup would cost more than the aggregation
+        return self._current_weather_from_row(aggregation_engine.aggregate_one(results), city, coords)
+    
+    def _aggregate_current_weather_batch(
+        self,
+        results_by_city: List[List[ProviderObservation]],
+        cities: List[str],
+        coords_list: List[Dict[str, float]]
+    ) -> List[Optional[CurrentWeather]]:
+        """Aggregate weather data of many cities, vectorized for large batches"""
+        rows = aggregation_engine.aggregate_results(results_by_city)
+        return [self._current_weather_from_row(row, city, coords) for row, city, coords in zip(rows, cities, coords_list)]
+    
+    def _current_weather_from_row(self, row: Dict, city: str, coords: Dict[str, float]) -> Optional[CurrentWeather]:
+        """Build the API model of an aggregated row"""
+        if row["temperature"] is None:
+            print(f"No temperature data available for {city}")
             return None
         
-        # Get humidity average
-        humidities = [r["humidity"] for r in results if "humidity" in r and r["humidity"] is not None]
-        avg_humidity = sum(humidities) / len(humidities) if humidities else None
-        
-        # Get wind speed average (note: would need to normalize units in real app)
-        wind_speeds = [r["wind"]["speed"] for r in results if "wind" in r and r["wind"] is not None]
-        avg_wind_speed = sum(wind_speeds) / len(wind_speeds) if wind_speeds else None
-        
-        # Get a representative weather condition (using the first one for simplicity)
-        condition = next((r["conditions"] for r in results if "conditions" in r), None)
-        
-        # Get sources
-        sources = [r["source"] for r in results]
-        
-        # Create aggregated weather data
+        condition = row["conditions"]
         weather_condition = None
         if condition:
             weather_condition = WeatherCondition(
                 main=condition.get("main", "Unknown"),
                 description=condition.get("description", "Unknown")
             )
-            
+        
         wind = None
-        if avg_wind_speed is not None:
+        if row["wind_speed"] is not None:
             wind = Wind(
-                speed=avg_wind_speed,
-                direction=next((r["wind"]["direction"] for r in results if "wind" in r and "direction" in r["wind"]), None),
-                unit="m/s"  # Simplified, would need proper unit conversion
+                speed=row["wind_speed"],
+                direction=row["wind_direction"],
+                unit="m/s"
             )
         
         try:
-            current_weather = CurrentWeather(
+            return CurrentWeather(
                 city=city,
                 coordinates=coords,
                 temperature=Temperature(
-                    current=avg_temp,
+                    current=row["temperature"],
                     unit="celsius"
                 ),
-                humidity=avg_humidity,
+                humidity=row["humidity"],
+                pressure=row["pressure"],
                 conditions=weather_condition,
                 wind=wind,
                 timestamp=datetime.now(),
-                sources=sources
+                sources=row["sources"],
+                spread=row["spread"]
             )
-            return current_weather
         except Exception as e:
             print(f"Error creating CurrentWeather object: {e}")
             return None
@@ -331,19 +590,35 @@ class WeatherService:
         return codes.get(code, "Unknown")
     
     async def get_forecast(self, city: str, days: int = 5) -> Optional[Forecast]:
-        """Get weather forecast for a city"""
-        # This would be implemented similarly to get_current_weather
-        # For now, we'll return a placeholder
+        """
+        Get weather forecast for a city. The forecast is fetched and cached
+        once at the maximum horizon, every `days` is a slice of that entry.
+        """
+        if self.negative_cache.check("forecast", city):
+            return None
+        
+        cache_key = f"weather:forecast:{city.lower()}"
+        cached = await self._get_cached(cache_key, Forecast)
+        if cached:
+            return self._slice_forecast(cached, days)
+        
         coords = self._get_city_coordinates(city)
         if not coords:
+            self.negative_cache.add_unknown(city)
             return None
+        
+        if is_stale_only():
+            return self._slice_forecast(await self._get_stale(cache_key, Forecast), days)
+        
+        # This would be implemented similarly to get_current_weather
+        # For now, we'll return a placeholder
             
         # In a real implementation, we would call the forecast endpoints
         # of our weather APIs and aggregate the results
         
         # Placeholder implementation
         forecast_items = []
-        for i in range(days):
+        for i in range(settings.FORECAST_MAX_DAYS):
             future_date = datetime.now() + timedelta(days=i)
             forecast_items.append(
                 ForecastItem(
@@ -360,43 +635,82 @@ class WeatherService:
                 )
             )
             
-        return Forecast(
+        result = Forecast(
             city=city,
             coordinates=coords,
             forecast_items=forecast_items,
             sources=["placeholder"]
         )
+        await self._cache(cache_key, result, ttl_policy.ttl_for("forecast"))
+        return self._slice_forecast(result, days)
+    
+    def _slice_forecast(self, forecast: Forecast, days: int) -> Forecast:
+        """First `days` items of a full-horizon forecast"""
+        if len(forecast.forecast_items) <= days:
+            return forecast
+        return forecast.model_copy(update={"forecast_items": forecast.forecast_items[:days]})
     
     async def get_history(self, city: str, days: int = 5) -> Optional[HistoricalWeather]:
         """Get historical weather data for a city"""
-        # This would be implemented similarly to get_forecast
-        # For now, we'll return a placeholder
+        if self.negative_cache.check("history", city):
+            return None
+        
+        # Past days do not change: the key rotates with the date and the entry lives long
+        cache_key = f"weather:history:{city.lower()}:{datetime.now().date().isoformat()}:{days}"
+        cached = await self._get_cached(cache_key, HistoricalWeather)
+        if cached:
+            return cached
+        
         coords = self._get_city_coordinates(city)
         if not coords:
+            self.negative_cache.add_unknown(city)
             return None
+        
+        if is_stale_only():
+            return await self._get_stale(cache_key, HistoricalWeather)
+        
+        # This would be implemented similarly to get_forecast
+        # For now, we'll return a placeholder
             
-        # Placeholder implementation
-        historical_data = []
-        for i in range(days):
-            past_date = datetime.now() - timedelta(days=i+1)
-            historical_data.append(
-                ForecastItem(
-                    timestamp=past_date,
-                    temperature=Temperature(
-                        current=20.0 - i,  # Placeholder temperature
-                        unit="celsius"
-                    ),
-                    humidity=70.0 + i,
-                    conditions=WeatherCondition(
-                        main="Clouds",
-                        description="Scattered clouds"
-                    )
-                )
-            )
+        historical_data = [self._history_item(i) for i in range(days)]
             
-        return HistoricalWeather(
+        result = HistoricalWeather(
             city=city,
             coordinates=coords,
             historical_data=historical_data,
             sources=["placeholder"]
         )
+        await self._cache(cache_key, result, ttl_policy.ttl_for("history"))
+        return result
+    
+    async def iter_history(self, city: str, days: int) -> AsyncIterator[ForecastItem]:
+        """
+        Yield the historical data of a city one day at a time, most recent
+        first, so long ranges are never held in memory. Unknown cities yield nothing.
+        """
+        if self.negative_cache.check("history", city):
+            return
+        
+        coords = self._get_city_coordinates(city)
+        if not coords:
+            self.negative_cache.add_unknown(city)
+            return
+        
+        for i in range(days):
+            yield self._history_item(i)
+    
+    def _history_item(self, days_ago: int) -> ForecastItem:
+        """Historical data of one past day"""
+        # Placeholder implementation
+        return ForecastItem(
+            timestamp=datetime.now() - timedelta(days=days_ago + 1),
+            temperature=Temperature(
+                current=20.0 - days_ago,  # Placeholder temperature
+                unit="celsius"
+            ),
+            humidity=70.0 + days_ago,
+            conditions=WeatherCondition(
+                main="Clouds",
+                description="Scattered clouds"
+            )
+        )
@@ -1,10 +1,22 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 import asyncio
 
 from src.main import app
 from src.services.weather_service import WeatherService
+from src.services.container import get_weather_service
+from src.services.health_service import health_service
+
+@pytest.fixture(autouse=True)
+def no_warm_up():
+    """Start the app without the network warm-up and background probes (DNS, Redis, provider pings)"""
+    probe = AsyncMock(return_value=True)
+    with patch("src.services.container.warm_up", AsyncMock(return_value={})) as warm_up, \
+         patch.object(health_service, "_probe_redis", probe), \
+         patch.object(health_service, "_probe_database", probe), \
+         patch.object(health_service, "_probe_provider", probe):
+        yield warm_up
 
 @pytest.fixture
 def test_client():
@@ -15,11 +27,10 @@ def test_client():
 @pytest.fixture
 def mock_weather_service():
     """Mock the WeatherService to avoid real API calls during tests"""
-    with patch("src.routers.weather.WeatherService") as mock_service:
-        # Configure the mock to return test data
-        service_instance = MagicMock(spec=WeatherService)
-        mock_service.return_value = service_instance
-        yield service_instance
+    service_instance = MagicMock(spec=WeatherService)
+    app.dependency_overrides[get_weather_service] = lambda: service_instance
+    yield service_instance
+    app.dependency_overrides.clear()
 
 @pytest.fixture
 def event_loop():
@@ -0,0 +1,61 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from types import SimpleNamespace
+from src.middleware.admission import AdmissionMiddleware
+from src.services.load_shedding import is_stale_only
+
+def make_client(in_flight=0, lag=0.0):
+    app = FastAPI()
+    
+    @app.get("/api/v1/weather/current/{city}")
+    async def current(city: str):
+        return {"stale_only": is_stale_only()}
+    
+    @app.get("/api/v1/weather/history/{city}")
+    async def history(city: str):
+        return {"stale_only": is_stale_only()}
+    
+    @app.get("/api/v1/health/live")
+    async def live():
+        return {"status": "alive"}
+    
+    admission = AdmissionMiddleware(app, max_in_flight=10, monitor=SimpleNamespace(lag=lag))
+    # Simulate the requests already being served
+    admission.in_flight = in_flight
+    return TestClient(admission)
+
+def test_admitted_under_normal_load():
+    """Test requests are served normally below the thresholds"""
+    client = make_client(in_flight=2)
+    
+    assert client.get("/api/v1/weather/current/Paris").json() == {"stale_only": False}
+    assert client.get("/api/v1/weather/history/Paris").status_code == 200
+
+def test_low_priority_routes_shed_first():
+    """Test history is rejected while current weather is still served"""
+    client = make_client(in_flight=6)
+    
+    response = client.get("/api/v1/weather/history/Paris")
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
+    assert client.get("/api/v1/weather/current/Paris").json() == {"stale_only": False}
+
+def test_stale_only_mode():
+    """Test weather requests are limited to the cache near the limit"""
+    client = make_client(in_flight=8)
+    
+    assert client.get("/api/v1/weather/current/Paris").json() == {"stale_only": True}
+
+def test_event_loop_lag_counts_as_overload():
+    """Test a lagging event loop triggers load shedding"""
+    client = make_client(lag=1.0)
+    
+    assert client.get("/api/v1/weather/history/Paris").status_code == 503
+    assert client.get("/api/v1/weather/current/Paris").json() == {"stale_only": True}
+
+def test_everything_rejected_at_the_limit_except_health():
+    """Test the limit rejects every request but health checks"""
+    client = make_client(in_flight=10)
+    
+    assert client.get("/api/v1/weather/current/Paris").status_code == 503
+    assert client.get("/api/v1/health/live").status_code == 200
@@ -0,0 +1,98 @@
+import pytest
+from src.services.aggregation import AggregationEngine
+from src.services.observation import ProviderObservation, wind_speed_ms
+
+def make_result(source, temperature, wind_speed=None, wind_unit="m/s", direction=None, humidity=None):
+    """Build a provider observation as the adapters do"""
+    return ProviderObservation(
+        source=source,
+        temperature=temperature,
+        humidity=humidity,
+        wind_speed=wind_speed_ms(wind_speed, wind_unit),
+        wind_direction=direction,
+        condition="Clear",
+        description=f"from {source}"
+    )
+
+@pytest.fixture
+def engine():
+    return AggregationEngine({"open_meteo": 1.0, "openweather": 1.0, "weatherapi": 1.0})
+
+def test_wind_speed_units_normalized(engine):
+    """Test km/h and m/s wind speeds are averaged in m/s"""
+    rows = engine.aggregate_results([[
+        make_result("open_meteo", 20.0, wind_speed=36.0, wind_unit="km/h"),
+        make_result("openweather", 20.0, wind_speed=12.0, wind_unit="m/s"),
+    ]])
+    
+    assert rows[0]["wind_speed"] == pytest.approx(11.0)
+    assert rows[0]["spread"]["wind_speed"] == pytest.approx(2.0)
+
+def test_weighted_mean():
+    """Test source weights are applied to the mean"""
+    engine = AggregationEngine({"open_meteo": 3.0, "openweather": 1.0})
+    rows = engine.aggregate_results([[
+        make_result("open_meteo", 20.0),
+        make_result("openweather", 24.0),
+    ]])
+    
+    assert rows[0]["temperature"] == pytest.approx(21.0)
+    assert rows[0]["spread"]["temperature"] == pytest.approx(4.0)
+    assert rows[0]["conditions"]["description"] == "from open_meteo"
+
+def test_circular_mean_wind_direction(engine):
+    """Test wind directions around north average to north, not south"""
+    rows = engine.aggregate_results([[
+        make_result("open_meteo", 20.0, wind_speed=5.0, direction=350.0),
+        make_result("openweather", 20.0, wind_speed=5.0, direction=10.0),
+    ]])
+    
+    direction = rows[0]["wind_direction"]
+    assert min(direction, 360 - direction) == pytest.approx(0.0, abs=1e-6)
+
+def test_missing_fields(engine):
+    """Test fields no source reported are None"""
+    rows = engine.aggregate_results([[make_result("open_meteo", 20.0)]])
+    
+    assert rows[0]["temperature"] == pytest.approx(20.0)
+    assert rows[0]["humidity"] is None
+    assert rows[0]["wind_speed"] is None
+    assert rows[0]["wind_direction"] is None
+    assert "humidity" not in rows[0]["spread"]
+
+def test_batch_of_cities(engine):
+    """Test many cities with different sources are aggregated independently"""
+    rows = engine.aggregate_results([
+        [make_result("open_meteo", 10.0, humidity=50), make_result("weatherapi", 12.0, humidity=70)],
+        [make_result("openweather", 30.0)],
+        [make_result("custom_source", 5.0)],
+    ])
+    
+    assert [row["temperature"] for row in rows] == pytest.approx([11.0, 30.0, 5.0])
+    assert rows[0]["humidity"] == pytest.approx(60.0)
+    assert rows[1]["sources"] == ["openweather"]
+    assert rows[2]["sources"] == ["custom_source"]
+
+def test_scalar_and_vectorized_paths_agree():
+    """Test the per-city loop and the NumPy pass give the same aggregates"""
+    weights = {"open_meteo": 2.0, "openweather": 1.0, "weatherapi": 0.5}
+    results_by_city = [
+        [
+            make_result("open_meteo", 10.0, wind_speed=20.0, wind_unit="km/h", direction=350.0, humidity=40),
+            make_result("openweather", 14.0, wind_speed=3.0, direction=20.0),
+            make_result("weatherapi", 11.0, humidity=90),
+        ],
+        [make_result("weatherapi", -3.0, direction=180.0)],
+        [make_result("custom_source", 5.0, wind_speed=1.0)],
+    ]
+    
+    scalar = AggregationEngine(weights, batch_min_cities=10 ** 9).aggregate_results(results_by_city)
+    vectorized = AggregationEngine(weights, batch_min_cities=1).aggregate_results(results_by_city)
+    
+    for one, other in zip(scalar, vectorized):
+        assert one.keys() == other.keys()
+        for field in ("temperature", "humidity", "pressure", "wind_speed", "wind_direction"):
+            assert one[field] == pytest.approx(other[field])
+        assert one["spread"] == pytest.approx(other["spread"])
+        assert one["conditions"] == other["conditions"]
+        assert one["sources"] == other["sources"]
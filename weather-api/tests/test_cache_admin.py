@@ -0,0 +1,147 @@
+import fnmatch
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.main import app
+from src.services.cache_admin import CacheAdmin
+from src.services.container import get_cache_admin
+from src.services.local_cache import LocalCache
+from src.services.redis_service import RedisService
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def unlink(self, key):
+        self.commands.append(lambda: int(self.redis.data.pop(key, None) is not None))
+
+    def memory_usage(self, key):
+        self.commands.append(lambda: len(self.redis.data[key]) + 50)
+
+    async def execute(self):
+        self.redis.pipelines += 1
+        return [command() for command in self.commands]
+
+class FakeRedis:
+    """Just enough of redis.asyncio for SCAN and pipelines"""
+    def __init__(self, data):
+        self.data = data
+        self.pipelines = 0
+
+    async def scan_iter(self, match="*", count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+@pytest.fixture
+def fake_redis():
+    data = {f"weather:current:city{i}": "x" * 100 for i in range(5)}
+    data["weather:forecast:paris"] = "x" * 1000
+    data["quota:openweather"] = "x"
+    return FakeRedis(data)
+
+@pytest.fixture
+def redis_service(fake_redis):
+    service = RedisService()
+    service.get_redis = AsyncMock(return_value=fake_redis)
+    return service
+
+@pytest.mark.asyncio
+async def test_delete_pattern(redis_service, fake_redis):
+    """Test matching keys are unlinked in pipelined batches"""
+    deleted = await redis_service.delete_pattern("weather:current:*", batch_size=2)
+    
+    assert deleted == 5
+    assert fake_redis.pipelines == 3
+    assert set(fake_redis.data) == {"weather:forecast:paris", "quota:openweather"}
+
+@pytest.mark.asyncio
+async def test_invalidation_seen_by_other_workers(fake_redis, tmp_path):
+    """Test a key deleted through one worker is not served by another one's local tier"""
+    workers = []
+    for name in ("a", "b"):
+        worker = RedisService(LocalCache(directory=str(tmp_path / name)))
+        worker.get_redis = AsyncMock(return_value=fake_redis)
+        workers.append(worker)
+    admin_worker, other_worker = workers
+    await other_worker.set("weather:current:paris", "data", ex=60)
+    assert await other_worker.get("weather:current:paris") == "data"
+    
+    await admin_worker.delete_pattern("weather:current:*")
+    
+    assert await other_worker.get("weather:current:paris") is None
+    for worker in workers:
+        await worker.close()
+
+@pytest.mark.asyncio
+async def test_stats(redis_service):
+    """Test key counts and sampled memory usage per prefix"""
+    stats = await CacheAdmin(redis_service, MagicMock()).stats(sample_size=2)
+    
+    current = stats["prefixes"]["weather:current"]
+    assert current["keys"] == 5
+    assert current["sampled"] == 2
+    assert current["estimated_bytes"] == 150 * 5
+    assert stats["prefixes"]["quota"]["keys"] == 1
+
+@pytest.fixture
+def admin_client():
+    cache_admin = MagicMock()
+    cache_admin.invalidate = AsyncMock(return_value=3)
+    app.dependency_overrides[get_cache_admin] = lambda: cache_admin
+    try:
+        with patch("src.routers.admin.settings.ADMIN_TOKEN", "secret"):
+            with TestClient(app) as client:
+                yield client, cache_admin
+    finally:
+        app.dependency_overrides.clear()
+
+def test_invalidate_requires_token(admin_client):
+    """Test the admin endpoints reject a missing token"""
+    client, _ = admin_client
+    response = client.delete("/api/v1/admin/cache?pattern=weather:current:*")
+    
+    assert response.status_code == 401
+
+def test_invalidate(admin_client):
+    """Test a pattern is invalidated, only inside the weather keyspace"""
+    client, cache_admin = admin_client
+    headers = {"X-Admin-Token": "secret"}
+    
+    response = client.delete("/api/v1/admin/cache?pattern=weather:current:*", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["deleted"] == 3
+    cache_admin.invalidate.assert_called_once_with("weather:current:*")
+    
+    assert client.delete("/api/v1/admin/cache?pattern=quota:*", headers=headers).status_code == 422
+
+def test_admin_disabled_without_token():
+    """Test the admin API is off when no token is configured"""
+    with patch("src.routers.admin.settings.ADMIN_TOKEN", None):
+        with TestClient(app) as client:
+            assert client.get("/api/v1/admin/cache/stats").status_code == 403
+
+def test_invalid_token_rejected(admin_client):
+    """Test a wrong token is rejected"""
+    client, cache_admin = admin_client
+    response = client.delete("/api/v1/admin/cache?pattern=weather:current:*", headers={"X-Admin-Token": "secreT"})
+    
+    assert response.status_code == 401
+    cache_admin.invalidate.assert_not_called()
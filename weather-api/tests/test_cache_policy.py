@@ -0,0 +1,52 @@
+import pytest
+from src.services.cache_policy import TTLPolicy
+
+@pytest.fixture
+def policy():
+    return TTLPolicy(
+        ttls={"current": 600, "forecast": 3600, "history": 86400},
+        update_intervals={"current": 900, "forecast": 3600},
+        update_delay=60,
+        min_ttl=30,
+        max_stable_ttl=3600,
+        stable_delta=0.5
+    )
+
+def test_current_ttl_aligned_to_provider_update(policy):
+    """Test current data expires just after the next 15-minute update"""
+    # 10 minutes past a boundary: the next update is 5 minutes away
+    assert policy.ttl_for("current", now=900 * 100 + 600) == 300 + 60
+
+def test_forecast_ttl_aligned_to_model_update(policy):
+    """Test forecast data expires just after the next hourly model update"""
+    assert policy.ttl_for("forecast", now=3600 * 10 + 3000) == 600 + 60
+
+def test_history_ttl(policy):
+    """Test history entries use their long TTL"""
+    assert policy.ttl_for("history", now=12345) == 86400
+
+def test_ttl_without_cadence():
+    """Test the default TTL is used when the provider cadence is unknown"""
+    policy = TTLPolicy(ttls={"current": 600}, update_intervals={}, update_delay=0, min_ttl=30)
+    
+    assert policy.ttl_for("current", now=0) == 600
+
+def test_stable_city_ttl_lengthened(policy):
+    """Test a city whose temperature barely changes is refreshed less often"""
+    now = 900 * 100
+    first = policy.ttl_for("current", city="Paris", temperature=20.0, now=now)
+    second = policy.ttl_for("current", city="Paris", temperature=20.2, now=now)
+    third = policy.ttl_for("current", city="Paris", temperature=20.1, now=now)
+    changed = policy.ttl_for("current", city="Paris", temperature=25.0, now=now)
+    
+    assert first == 960
+    assert second == 960 + 900
+    assert third == 960 + 1800
+    assert changed == 960
+
+def test_stable_ttl_capped(policy):
+    """Test the lengthened TTL never exceeds the cap"""
+    for _ in range(10):
+        ttl = policy.ttl_for("current", city="Rome", temperature=18.0, now=900 * 100)
+    
+    assert ttl == 3600
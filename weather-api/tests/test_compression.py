@@ -0,0 +1,83 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from src.middleware import compression
+from src.middleware.compression import CompressionMiddleware, choose_encoding
+
+PAYLOAD = {"items": [{"temperature": 20.0 + i, "humidity": 60.0} for i in range(30)]}
+
+@pytest.fixture
+def test_client():
+    """Return a TestClient for a small app behind the compression middleware"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, cache_entries=16)
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield b'{"chunk": %d}\n' % i
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    with TestClient(app) as client:
+        yield client
+
+def test_choose_encoding():
+    """Test the Accept-Encoding negotiation"""
+    assert choose_encoding("gzip") == "gzip"
+    assert choose_encoding("gzip;q=0.5, br") == "br"
+    assert choose_encoding("br;q=0, gzip") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+
+def test_gzip_response(test_client):
+    """Test a large JSON body is gzip-compressed"""
+    response = test_client.get("/large", headers={"Accept-Encoding": "gzip"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == PAYLOAD
+    assert int(response.headers["content-length"]) < len(response.content)
+
+def test_brotli_response(test_client):
+    """Test brotli is preferred when the client accepts it"""
+    pytest.importorskip("brotli")
+    response = test_client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+    
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == PAYLOAD
+
+def test_small_response_not_compressed(test_client):
+    """Test bodies under the threshold are sent as is"""
+    response = test_client.get("/small", headers={"Accept-Encoding": "gzip"})
+    
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+def test_streaming_response_passed_through(test_client):
+    """Test streamed bodies are not buffered nor compressed"""
+    response = test_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    
+    assert "content-encoding" not in response.headers
+    assert response.text.count("chunk") == 3
+
+def test_identical_bodies_compressed_once(test_client):
+    """Test hot responses reuse the stored compressed body"""
+    with patch.object(compression, "compress", wraps=compression.compress) as compress:
+        first = test_client.get("/large", headers={"Accept-Encoding": "gzip"})
+        second = test_client.get("/large", headers={"Accept-Encoding": "gzip"})
+    
+    assert compress.call_count == 1
+    assert first.content == second.content
@@ -2,10 +2,11 @@ import pytest
 import json
 from jsonschema import validate
 from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import MagicMock, AsyncMock
 from datetime import datetime
 
 from src.main import app
+from src.services.container import get_weather_service
 from src.schemas.weather import CurrentWeather, Forecast, HistoricalWeather, Temperature, Wind, WeatherCondition, ForecastItem
 
 # Schémas JSON pour la validation des contrats
@@ -156,9 +157,10 @@ def test_client():
 @pytest.fixture
 def mock_weather_service():
     """Mock the WeatherService to avoid real API calls during tests"""
-    with patch("src.routers.weather.WeatherService") as mock_service:
+    service_instance = MagicMock()
+    app.dependency_overrides[get_weather_service] = lambda: service_instance
+    try:
         # Configure the mock to return test data
-        service_instance = mock_service.return_value
         
         # Mock get_current_weather
         service_instance.get_current_weather = AsyncMock()
@@ -195,9 +197,9 @@ def mock_weather_service():
             sources=["openweather", "weatherapi"]
         )
         
-        # Mock get_weather_history
-        service_instance.get_weather_history = AsyncMock()
-        service_instance.get_weather_history.return_value = HistoricalWeather(
+        # Mock get_history
+        service_instance.get_history = AsyncMock()
+        service_instance.get_history.return_value = HistoricalWeather(
             city="Paris",
             historical_data=[
                 ForecastItem(
@@ -219,6 +221,8 @@ def mock_weather_service():
         )
         
         yield service_instance
+    finally:
+        app.dependency_overrides.clear()
 
 def test_current_weather_contract(test_client, mock_weather_service):
     """Test that the current weather endpoint response matches the contract schema"""
@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.middleware.deadline import DeadlineMiddleware
+from src.services.deadline import DeadlineExceeded, bounded_timeout, remaining, reset_deadline, set_deadline
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware, default_timeout=1.0, max_timeout=5.0)
+    
+    @app.get("/remaining")
+    async def get_remaining():
+        return {"remaining": remaining()}
+    
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(2)
+        return {}
+    
+    with TestClient(app) as client:
+        yield client
+
+def test_deadline_from_header(client):
+    """Test the header sets the deadline, capped at the maximum"""
+    assert 0 < client.get("/remaining").json()["remaining"] <= 1.0
+    assert 1.0 < client.get("/remaining", headers={"X-Request-Timeout": "3"}).json()["remaining"] <= 3.0
+    assert client.get("/remaining", headers={"X-Request-Timeout": "60"}).json()["remaining"] <= 5.0
+    assert client.get("/remaining", headers={"X-Request-Timeout": "soon"}).json()["remaining"] <= 1.0
+
+def test_deadline_exceeded(client):
+    """Test a handler still running at the deadline is cancelled with a 504"""
+    response = client.get("/slow", headers={"X-Request-Timeout": "0.05"})
+    
+    assert response.status_code == 504
+
+def test_bounded_timeout():
+    """Test upstream timeouts are shortened to the deadline"""
+    assert bounded_timeout(10.0) == 10.0
+    
+    token = set_deadline(1.0)
+    try:
+        assert bounded_timeout(10.0) <= 1.0
+    finally:
+        reset_deadline(token)
+    
+    token = set_deadline(-1.0)
+    try:
+        with pytest.raises(DeadlineExceeded):
+            bounded_timeout(10.0)
+    finally:
+        reset_deadline(token)
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_handler():
+    """Test a GET handler is cancelled when the client disconnects, without reading the body"""
+    cancelled = asyncio.Event()
+    
+    async def slow_app(scope, receive, send):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    middleware = DeadlineMiddleware(slow_app, default_timeout=5.0, max_timeout=5.0)
+    scope = {"type": "http", "method": "GET", "path": "/slow", "headers": []}
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(0.05)
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        raise AssertionError("Nothing should be sent to a disconnected client")
+    
+    await asyncio.wait_for(middleware(scope, receive, send), timeout=1)
+    
+    assert cancelled.is_set()
+
+@pytest.mark.asyncio
+async def test_body_replayed_to_app():
+    """Test a streamed request body reaches the app unchanged"""
+    received = []
+    
+    async def echo_app(scope, receive, send):
+        while True:
+            message = await receive()
+            received.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"".join(received)})
+    
+    middleware = DeadlineMiddleware(echo_app, default_timeout=5.0, max_timeout=5.0)
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": [(b"transfer-encoding", b"chunked")]}
+    chunks = [
+        {"type": "http.request", "body": b"ab", "more_body": True},
+        {"type": "http.request", "body": b"cd", "more_body": False},
+    ]
+    
+    async def receive():
+        if chunks:
+            return chunks.pop(0)
+        await asyncio.sleep(10)
+    
+    sent = []
+    async def send(message):
+        sent.append(message)
+    
+    await asyncio.wait_for(middleware(scope, receive, send), timeout=1)
+    
+    assert received == [b"ab", b"cd"]
+    assert sent[-1]["body"] == b"abcd"
@@ -1,7 +1,11 @@
 import pytest
+import asyncio
+from datetime import datetime
 from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.main import app
+from src.services.health_service import HealthService, health_service, get_health_service
 
 @pytest.fixture
 def test_client():
@@ -32,3 +36,74 @@ def test_root_endpoint(test_client):
     data = response.json()
     assert "message" in data
     assert "Welcome" in data["message"]
+
+def test_liveness(test_client):
+    """Test the liveness endpoint never depends on the probes"""
+    response = test_client.get("/api/v1/health/live")
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+def test_readiness_before_warm_up(test_client):
+    """Test the readiness endpoint reports 503 until the application has warmed up"""
+    app.dependency_overrides[get_health_service] = lambda: HealthService(AsyncMock())
+    try:
+        response = test_client.get("/api/v1/health/ready")
+    finally:
+        app.dependency_overrides.clear()
+    
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+def test_detailed_health_reads_cached_snapshot(test_client):
+    """Test the detailed endpoint serves the last snapshot without probing again"""
+    snapshot = {
+        "checked_at": datetime.now().isoformat(),
+        "database": "up",
+        "redis": "down",
+        "external_apis": {"open_meteo": "up", "openweather": "up", "weatherapi": "up"}
+    }
+    
+    with patch.object(health_service, "_snapshot", snapshot):
+        with patch.object(health_service, "refresh", AsyncMock()) as refresh:
+            response = test_client.get("/api/v1/health/detailed")
+            ready = test_client.get("/api/v1/health/ready")
+    
+    refresh.assert_not_called()
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "degraded"
+    assert data["dependencies"]["redis_cache"] == "down"
+    assert data["dependencies"]["database"] == "up"
+    assert ready.status_code == 200
+
+@pytest.mark.asyncio
+async def test_refresh_runs_probes_with_timeout():
+    """Test a probe exceeding its timeout is reported as down"""
+    redis_mock = AsyncMock()
+    redis_mock.health_check.return_value = True
+    service = HealthService(redis_mock, interval=60, probe_timeout=0.05)
+    
+    async def slow_probe(*args):
+        await asyncio.sleep(1)
+        return True
+    
+    with patch.object(service, "_probe_database", slow_probe), \
+         patch.object(service, "_probe_provider", AsyncMock(return_value=True)):
+        snapshot = await service.refresh()
+    
+    assert snapshot["redis"] == "up"
+    assert snapshot["database"] == "down"
+    assert snapshot["external_apis"] == {"open_meteo": "up", "openweather": "up", "weatherapi": "up"}
+    assert await service.get_snapshot() is snapshot
+
+def test_database_probe_bounds_connect():
+    """Test the database probe thread gives up connecting on its own"""
+    sqlalchemy = MagicMock()
+    service = HealthService(AsyncMock(), interval=60, probe_timeout=2.5)
+    
+    with patch.dict("sys.modules", {"sqlalchemy": sqlalchemy}):
+        assert service._select_one() is True
+    
+    kwargs = sqlalchemy.create_engine.call_args.kwargs
+    assert kwargs["connect_args"] == {"connect_timeout": 3}
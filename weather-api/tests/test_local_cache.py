@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from src.services.local_cache import LocalCache
+from src.services.redis_service import RedisService
+
+@pytest.fixture
+def local_cache(tmp_path):
+    cache = LocalCache(directory=str(tmp_path), max_bytes=10_000, stale_ttl=3600)
+    yield cache
+    cache.close()
+
+def test_set_and_get(local_cache):
+    """Test values are served from memory until they expire"""
+    local_cache.set("weather:current:paris", "data", ex=60)
+    assert local_cache.get("weather:current:paris") == "data"
+
+    local_cache.set("weather:current:lyon", "old", ex=-1)
+    assert local_cache.get("weather:current:lyon") is None
+    assert local_cache.get("weather:current:lyon", allow_stale=True) == "old"
+
+def test_delete(local_cache, tmp_path):
+    """Test a deletion survives a restart"""
+    local_cache.set("key", "value", ex=60)
+    local_cache.delete("key")
+    local_cache.close()
+
+    assert LocalCache(directory=str(tmp_path)).get("key") is None
+
+def test_warm_restart(local_cache, tmp_path):
+    """Test a new process adopts the file of an exited worker"""
+    orphan = tmp_path / "cache-999999.log"
+    orphan.write_text(
+        json.dumps(["weather:current:paris", time.time() + 60, "data"]) + "\n"
+        + '["truncated", 1'
+    )
+
+    assert local_cache.get("weather:current:paris") == "data"
+    assert not orphan.exists()
+
+def test_disk_usage_bounded(local_cache):
+    """Test compaction keeps the file under the budget"""
+    for i in range(200):
+        local_cache.set(f"key:{i}", "x" * 100, ex=60)
+    local_cache.flush()
+
+    assert local_cache.path.stat().st_size <= local_cache.max_bytes
+    assert local_cache.get("key:199") == "x" * 100
+
+@pytest.mark.asyncio
+async def test_redis_service_falls_back_to_local_cache(local_cache):
+    """Test values written while Redis is down are still served locally"""
+    with patch("src.services.redis_service.redis.from_url", side_effect=Exception("Connection error")):
+        service = RedisService(local_cache=local_cache)
+
+        assert await service.set("weather:current:paris", "data", ex=60) is False
+        assert await service.get("weather:current:paris") == "data"
+
+def test_writes_off_the_calling_thread(local_cache):
+    """Test the file is written by the writer thread, the index updated at once"""
+    written = []
+    real_write = local_cache._write
+    local_cache.get("warm-up")
+    with patch.object(local_cache, "_write", lambda line: written.append(threading.current_thread()) or real_write(line)):
+        local_cache.set("weather:current:paris", "data", ex=60)
+        assert local_cache.get("weather:current:paris") == "data"
+        local_cache.flush()
+
+    assert written and written[0] is not threading.current_thread()
+    assert b"weather:current:paris" in local_cache.path.read_bytes()
+
+@pytest.mark.asyncio
+async def test_redis_miss_not_served_from_local_cache(local_cache):
+    """Test a key expired or invalidated in Redis is not revived from the local tier"""
+    client = AsyncMock()
+    client.get.return_value = None
+    with patch("src.services.redis_service.redis.from_url", return_value=client):
+        service = RedisService(local_cache=local_cache)
+        local_cache.set("weather:current:paris", "data", ex=60)
+
+        assert await service.get("weather:current:paris") is None
+
+@pytest.mark.asyncio
+async def test_open_loads_off_the_event_loop(tmp_path):
+    """Test the file is loaded by the writer thread when opened from the event loop"""
+    (tmp_path / "cache-999999.log").write_text(json.dumps(["weather:current:paris", time.time() + 60, "data"]) + "\n")
+    cache = LocalCache(directory=str(tmp_path))
+    threads = []
+    load = cache._load
+    def record_thread(path):
+        threads.append(threading.current_thread())
+        load(path)
+    
+    with patch.object(cache, "_load", record_thread):
+        await cache.open()
+    
+    assert threads and threading.main_thread() not in threads
+    assert cache.get("weather:current:paris") == "data"
+    cache.close()
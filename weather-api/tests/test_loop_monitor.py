@@ -0,0 +1,49 @@
+import asyncio
+import time
+import pytest
+from src.services.loop_monitor import LoopLagMonitor
+
+@pytest.mark.asyncio
+async def test_lag_measured_when_loop_blocked():
+    """Test a blocking call shows up as event loop lag"""
+    monitor = LoopLagMonitor(interval=0.01, slow_callback_threshold=0)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)
+        # Let the delayed timer fire, the next tick has not completed yet
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert monitor.lag >= 0.05
+        assert monitor._watchdog is None
+    finally:
+        await monitor.stop()
+
+@pytest.mark.asyncio
+async def test_slow_callback_stack_printed_once(capsys):
+    """Test the watchdog prints the stack of a blocking callback once per stall"""
+    monitor = LoopLagMonitor(interval=0.01, slow_callback_threshold=0.05)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.02)
+        def blocking_work():
+            time.sleep(0.3)
+        blocking_work()
+        await asyncio.sleep(0.02)
+    finally:
+        await monitor.stop()
+    
+    output = capsys.readouterr().out
+    assert output.count("Event loop blocked") == 1
+    assert "blocking_work" in output
+
+@pytest.mark.asyncio
+async def test_watchdog_quiet_when_loop_responsive(capsys):
+    """Test nothing is printed while the loop keeps ticking"""
+    monitor = LoopLagMonitor(interval=0.01, slow_callback_threshold=0.05)
+    await monitor.start()
+    await asyncio.sleep(0.2)
+    await monitor.stop()
+    
+    assert "Event loop blocked" not in capsys.readouterr().out
+    assert monitor._watchdog is None
@@ -0,0 +1,39 @@
+import httpx
+from prometheus_client import REGISTRY
+
+from src.middleware.prometheus import get_metrics_registry
+from src.services.http_client import parse_json
+
+def test_single_process_registry(monkeypatch):
+    """Test the default registry is used when a single process serves the app"""
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    
+    assert get_metrics_registry() is REGISTRY
+
+def test_multiprocess_registry(monkeypatch, tmp_path):
+    """Test the samples of all workers are collected from the shared directory"""
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    
+    registry = get_metrics_registry()
+    
+    assert registry is not REGISTRY
+    assert list(registry.collect()) == []
+
+def test_metrics_endpoint(test_client):
+    """Test the metrics endpoint exposes the HTTP metrics"""
+    test_client.get("/")
+    response = test_client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
+
+def test_parse_json_tracks_payload():
+    """Test provider responses are decoded and their size recorded"""
+    response = httpx.Response(200, content=b'{"current": {"temperature_2m": 18.4}}')
+    before = REGISTRY.get_sample_value("api_external_response_bytes_sum", {"api_name": "test_api"}) or 0
+    
+    data = parse_json(response, "test_api")
+    
+    assert data == {"current": {"temperature_2m": 18.4}}
+    after = REGISTRY.get_sample_value("api_external_response_bytes_sum", {"api_name": "test_api"})
+    assert after - before == len(response.content)
@@ -0,0 +1,36 @@
+import pytest
+from unittest.mock import patch
+from src.services.negative_cache import NegativeCache, UNKNOWN_LOCATION, UPSTREAM_FAILURE
+
+@pytest.fixture
+def negative_cache():
+    return NegativeCache(ttls={UNKNOWN_LOCATION: 300, UPSTREAM_FAILURE: 30}, max_entries=2)
+
+def test_unknown_location_applies_to_every_data_type(negative_cache):
+    """Test an unknown city is skipped for current, forecast and history"""
+    negative_cache.add_unknown("Atlantis")
+
+    assert negative_cache.check("current", "atlantis") == UNKNOWN_LOCATION
+    assert negative_cache.check("history", "ATLANTIS") == UNKNOWN_LOCATION
+
+def test_failure_applies_to_its_data_type(negative_cache):
+    """Test an upstream failure only holds for the data type that failed"""
+    negative_cache.add_failure("current", "Paris")
+
+    assert negative_cache.check("current", "Paris") == UPSTREAM_FAILURE
+    assert negative_cache.check("forecast", "Paris") is None
+
+def test_entries_expire(negative_cache):
+    """Test entries are dropped after their TTL"""
+    with patch("src.services.negative_cache.time.monotonic", return_value=1000.0):
+        negative_cache.add_failure("current", "Paris")
+    with patch("src.services.negative_cache.time.monotonic", return_value=1031.0):
+        assert negative_cache.check("current", "Paris") is None
+
+def test_oldest_entries_evicted(negative_cache):
+    """Test the number of entries is bounded"""
+    for city in ["a", "b", "c"]:
+        negative_cache.add_unknown(city)
+
+    assert negative_cache.check("current", "a") is None
+    assert negative_cache.check("current", "c") == UNKNOWN_LOCATION
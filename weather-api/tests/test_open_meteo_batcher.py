@@ -0,0 +1,103 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+from src.services.open_meteo_batcher import OpenMeteoBatcher
+from src.services.provider_registry import ProviderBulkhead
+
+PARIS = {"lat": 48.8566, "lon": 2.3522}
+LONDON = {"lat": 51.5074, "lon": -0.1278}
+
+def make_client(payload):
+    """Mock HTTP client answering every request with the payload"""
+    response = MagicMock()
+    response.content = json.dumps(payload).encode()
+    client = MagicMock(is_closed=False)
+    client.get = AsyncMock(return_value=response)
+    return client
+
+def make_bulkhead(client):
+    return ProviderBulkhead("open_meteo", max_concurrency=5, queue_timeout=0.5, max_connections=5, client=client)
+
+def make_batcher(client, window=0.01, max_size=10):
+    return OpenMeteoBatcher(
+        "https://open-meteo.test/v1", params={"current_weather": "true"}, bulkhead=make_bulkhead(client), window=window, max_size=max_size
+    )
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_share_one_request():
+    """Test cache misses arriving together are sent as one multi-location request"""
+    client = make_client([{"latitude": 48.86}, {"latitude": 51.5}])
+    
+    batcher = make_batcher(client)
+    paris, london, paris_again = await asyncio.gather(
+        batcher.load(PARIS), batcher.load(LONDON), batcher.load(PARIS)
+    )
+    
+    client.get.assert_called_once()
+    params = client.get.call_args.kwargs["params"]
+    assert params["latitude"] == "48.8566,51.5074"
+    assert params["longitude"] == "2.3522,-0.1278"
+    assert params["current_weather"] == "true"
+    assert paris == {"latitude": 48.86}
+    assert london == {"latitude": 51.5}
+    assert paris_again == paris
+
+@pytest.mark.asyncio
+async def test_single_location_response():
+    """Test a lone location answered with an object instead of a list"""
+    client = make_client({"latitude": 48.86})
+    
+    batcher = make_batcher(client)
+    result = await batcher.load(PARIS)
+    
+    assert result == {"latitude": 48.86}
+
+@pytest.mark.asyncio
+async def test_max_size_flushes_immediately():
+    """Test a full batch is sent without waiting for the window"""
+    client = make_client([{"id": 1}, {"id": 2}])
+    batcher = make_batcher(client, window=10, max_size=2)
+    
+    results = await asyncio.wait_for(asyncio.gather(batcher.load(PARIS), batcher.load(LONDON)), timeout=1)
+    
+    assert results == [{"id": 1}, {"id": 2}]
+
+@pytest.mark.asyncio
+async def test_upstream_error_propagated():
+    """Test every waiting caller gets the upstream error"""
+    client = MagicMock(is_closed=False)
+    client.get = AsyncMock(side_effect=Exception("upstream down"))
+    
+    batcher = make_batcher(client)
+    results = await asyncio.gather(batcher.load(PARIS), batcher.load(LONDON), return_exceptions=True)
+    
+    assert all(str(r) == "upstream down" for r in results)
+
+@pytest.mark.asyncio
+async def test_short_response_fails_every_caller():
+    """Test a response missing locations fails the callers instead of leaving them waiting"""
+    batcher = make_batcher(make_client([{"latitude": 48.86}]))
+    
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.load(PARIS), batcher.load(LONDON), return_exceptions=True), timeout=1
+    )
+    
+    assert all(isinstance(r, ValueError) for r in results)
+
+@pytest.mark.asyncio
+async def test_close_cancels_requests_in_flight():
+    """Test shutdown cancels the batched request and its waiting callers"""
+    async def hanging_get(*args, **kwargs):
+        await asyncio.sleep(10)
+    client = MagicMock(is_closed=False)
+    client.get = hanging_get
+    batcher = make_batcher(client)
+    
+    caller = asyncio.ensure_future(batcher.load(PARIS))
+    await asyncio.sleep(0.05)
+    await batcher.close()
+    
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(caller, timeout=1)
+    assert not batcher._dispatch_tasks
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from src.services.provider_registry import BulkheadFull, ProviderBulkhead, ProviderRegistry
+
+@pytest.mark.asyncio
+async def test_concurrency_bounded():
+    """Test no more than max_concurrency calls run at once"""
+    bulkhead = ProviderBulkhead("test_provider", max_concurrency=2, queue_timeout=1.0, max_connections=2)
+    peak = 0
+    
+    async def call():
+        nonlocal peak
+        async with bulkhead.slot():
+            peak = max(peak, bulkhead.in_flight)
+            await asyncio.sleep(0.01)
+    
+    await asyncio.gather(*(call() for _ in range(6)))
+    
+    assert peak == 2
+    assert bulkhead.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_saturated_provider_fails_fast():
+    """Test callers give up once the queue-wait timeout passes"""
+    bulkhead = ProviderBulkhead("test_provider", max_concurrency=1, queue_timeout=0.02, max_connections=1)
+    release = asyncio.Event()
+    
+    async def hold():
+        async with bulkhead.slot():
+            await release.wait()
+    
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    with pytest.raises(BulkheadFull):
+        async with bulkhead.slot():
+            pass
+    release.set()
+    await holder
+
+@pytest.mark.asyncio
+async def test_registry_isolates_connection_pools():
+    """Test every provider has its own client"""
+    registry = ProviderRegistry({
+        "a": {"max_concurrency": 1, "queue_timeout": 0.1, "max_connections": 1},
+        "b": {"max_concurrency": 1, "queue_timeout": 0.1, "max_connections": 1},
+    })
+    
+    assert registry.get("a").client is not registry.get("b").client
+    await registry.close()
+
+@pytest.mark.asyncio
+async def test_permit_kept_when_timeout_races_acquire(monkeypatch):
+    """Test a permit acquired just as the queue timeout fires is given back"""
+    bulkhead = ProviderBulkhead("test_provider", max_concurrency=1, queue_timeout=0.1, max_connections=1)
+    
+    async def late_timeout(awaitable, timeout):
+        # acquire() succeeds, then the timeout wins anyway (wait_for before 3.12)
+        await awaitable
+        raise asyncio.TimeoutError()
+    monkeypatch.setattr(asyncio, "wait_for", late_timeout)
+    
+    with pytest.raises(BulkheadFull):
+        async with bulkhead.slot():
+            pass
+    monkeypatch.undo()
+    
+    async with bulkhead.slot():
+        assert bulkhead.in_flight == 1
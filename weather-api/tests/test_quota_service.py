@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.services.quota_service import QuotaManager
+from src.services.weather_service import WeatherService
+from src.middleware.prometheus import API_QUOTA_REMAINING
+
+@pytest.fixture
+def mock_script():
+    """Mock registered Lua script returning an allowed call"""
+    return AsyncMock(return_value=[1, "41.5"])
+
+@pytest.fixture
+def mock_redis_service(mock_script):
+    """Mock Redis service whose client registers the token bucket script"""
+    client = MagicMock()
+    client.register_script.return_value = mock_script
+    redis_mock = AsyncMock()
+    redis_mock.get_redis.return_value = client
+    return redis_mock
+
+@pytest.fixture
+def quota_manager(mock_redis_service):
+    return QuotaManager(mock_redis_service, quotas={"openweather": (60, 1.0)})
+
+@pytest.mark.asyncio
+async def test_acquire_within_budget(quota_manager, mock_script):
+    """Test a call within budget is allowed and the gauge updated"""
+    assert await quota_manager.acquire("openweather") is True
+    
+    mock_script.assert_called_once_with(keys=["quota:openweather"], args=[60, 1.0, 1])
+    assert API_QUOTA_REMAINING.labels(api_name="openweather")._value.get() == 41.5
+
+@pytest.mark.asyncio
+async def test_acquire_over_budget(quota_manager, mock_script):
+    """Test a call over budget is refused"""
+    mock_script.return_value = [0, "0.3"]
+    
+    assert await quota_manager.acquire("openweather") is False
+
+@pytest.mark.asyncio
+async def test_script_registered_once(quota_manager, mock_redis_service):
+    """Test the Lua script is registered once per client"""
+    await quota_manager.acquire("openweather")
+    await quota_manager.acquire("openweather")
+    
+    client = await mock_redis_service.get_redis()
+    client.register_script.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_acquire_without_redis_fails_open(quota_manager, mock_redis_service):
+    """Test calls are allowed when Redis is not available"""
+    mock_redis_service.get_redis.return_value = None
+    
+    assert await quota_manager.acquire("openweather") is True
+
+@pytest.mark.asyncio
+async def test_provider_skipped_when_quota_exhausted(mock_redis_service):
+    """Test the OpenWeather adapter is skipped instead of calling the API"""
+    quota_mock = AsyncMock()
+    quota_mock.acquire.return_value = False
+    service = WeatherService(redis_service=mock_redis_service, quota_manager=quota_mock)
+    service.openweather_api_key = "test-key"
+    
+    result = await service._get_openweather_current("Paris")
+    
+    assert result is None
+    quota_mock.acquire.assert_called_once_with("openweather")
@@ -0,0 +1,64 @@
+import logging
+import pytest
+from unittest.mock import patch
+from src.server import AccessLogSampler, main, protocol_options, server_options, worker_count
+
+def access_record(status_code):
+    return logging.LogRecord(
+        "uvicorn.access", logging.INFO, __file__, 0,
+        '%s - "%s %s HTTP/%s" %d', ("127.0.0.1:5000", "GET", "/", "1.1", status_code), None
+    )
+
+def test_production_profile():
+    """Test the production profile disables reload and tunes the server"""
+    with patch("src.server.settings.ACCESS_LOG_SAMPLE_RATE", 0.0):
+        options = server_options("production", workers=3)
+    
+    assert options["reload"] is False
+    assert options["workers"] == 3
+    assert options["access_log"] is False
+    assert options["backlog"] >= 2048
+    assert options["server_header"] is False
+
+def test_development_profile_reloads():
+    """Test the development profile keeps auto-reload"""
+    assert server_options("development") == {"reload": True}
+    with pytest.raises(ValueError):
+        server_options("turbo")
+
+def test_worker_count_derived_from_cpus():
+    """Test WORKERS=0 runs one worker per available CPU"""
+    with patch("src.server.settings.WORKERS", 0), patch("src.server.cpu_count", return_value=6):
+        assert worker_count() == 6
+    with patch("src.server.settings.WORKERS", 2):
+        assert worker_count() == 2
+
+def test_access_log_sampler_keeps_server_errors():
+    """Test sampling drops ordinary requests but never server errors"""
+    sampler = AccessLogSampler(rate=0.0)
+    
+    assert not sampler.filter(access_record(200))
+    assert sampler.filter(access_record(503))
+    assert AccessLogSampler(rate=1.0).filter(access_record(200))
+
+def test_protocol_fallback_is_silent(capsys):
+    """Test building the profile options prints nothing, the launcher warns instead"""
+    with patch("src.server.uvloop", None), patch("src.server.httptools", None):
+        options = protocol_options()
+    
+    assert options["loop"] == "asyncio"
+    assert options["http"] == "h11"
+    assert capsys.readouterr().out == ""
+
+def test_several_workers_run_by_gunicorn():
+    """Test multi-worker runs go through gunicorn, which cleans up dead workers' metrics"""
+    with patch("sys.argv", ["src.server", "--workers", "4", "--port", "9000"]), \
+         patch("src.server.os.execvp") as execvp, \
+         patch("src.server.uvicorn.run") as run:
+        main()
+    
+    run.assert_not_called()
+    command = execvp.call_args.args[1]
+    assert command[1:4] == ["-m", "gunicorn", "src.main:app"]
+    assert command[command.index("--workers") + 1] == "4"
+    assert command[command.index("--bind") + 1] == "0.0.0.0:9000"
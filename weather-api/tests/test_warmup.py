@@ -0,0 +1,77 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.services.container import ServiceContainer
+from src.services.warmup import warm_up
+
+@pytest.fixture
+def dependencies():
+    """Redis and health services whose warm-up steps succeed instantly"""
+    redis_service = MagicMock()
+    redis_service.get_redis = AsyncMock()
+    redis_service.prefill_local_cache = AsyncMock(return_value=0)
+    health_service = MagicMock()
+    health_service.refresh = AsyncMock()
+    with patch("src.services.warmup.resolve_upstream_hosts", AsyncMock()):
+        yield redis_service, health_service
+
+@pytest.mark.asyncio
+async def test_failing_step_does_not_stop_the_others(dependencies):
+    """Test a failing step is reported and the next steps still run"""
+    redis_service, health_service = dependencies
+    redis_service.get_redis.side_effect = ConnectionError("Redis down")
+    
+    timings = await warm_up(redis_service, health_service)
+    
+    assert set(timings) == {"city_data", "dns", "redis", "local_cache", "connection_pools"}
+    redis_service.prefill_local_cache.assert_awaited_once()
+    health_service.refresh.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_slow_step_bounded_by_timeout(dependencies):
+    """Test a hanging step is abandoned after WARMUP_TIMEOUT"""
+    redis_service, health_service = dependencies
+    async def hanging():
+        await asyncio.sleep(10)
+    redis_service.get_redis.side_effect = hanging
+    
+    with patch("src.services.warmup.settings.WARMUP_TIMEOUT", 0.05):
+        start = time.perf_counter()
+        timings = await warm_up(redis_service, health_service)
+    
+    assert time.perf_counter() - start < 1
+    assert timings["redis"] < 1
+    health_service.refresh.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_steps_created_when_they_run(dependencies):
+    """Test a step's coroutine is not created before the previous steps finish"""
+    redis_service, health_service = dependencies
+    async def check_order():
+        assert not redis_service.prefill_local_cache.called
+        assert not health_service.refresh.called
+    redis_service.get_redis.side_effect = check_order
+    
+    timings = await warm_up(redis_service, health_service)
+    
+    assert "redis" in timings
+    redis_service.get_redis.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_slow_warm_up_does_not_block_readiness(dependencies):
+    """Test the application reports ready even when a dependency hangs during warm-up"""
+    redis_service, _ = dependencies
+    async def hanging():
+        await asyncio.sleep(10)
+    redis_service.get_redis.side_effect = hanging
+    health_service = MagicMock()
+    health_service.refresh = AsyncMock()
+    health_service.start = AsyncMock()
+    container = ServiceContainer(redis_service=redis_service, health_service=health_service, weather_service=MagicMock())
+    
+    with patch("src.services.warmup.settings.WARMUP_TIMEOUT", 0.05), \
+         patch("src.services.container.loop_lag_monitor", AsyncMock()):
+        await asyncio.wait_for(container.startup(), timeout=1)
+    
+    health_service.mark_ready.assert_called_once()
@@ -1,9 +1,11 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import MagicMock, AsyncMock
 from datetime import datetime
 
 from src.main import app
+from src.services.container import get_weather_service
 from src.schemas.weather import CurrentWeather, Forecast, HistoricalWeather, Temperature, Wind, WeatherCondition, ForecastItem
 
 @pytest.fixture
@@ -15,9 +17,10 @@ def test_client():
 @pytest.fixture
 def mock_weather_service():
     """Mock the WeatherService to avoid real API calls during tests"""
-    with patch("src.routers.weather.WeatherService") as mock_service:
+    service_instance = MagicMock()
+    app.dependency_overrides[get_weather_service] = lambda: service_instance
+    try:
         # Configure the mock to return test data
-        service_instance = mock_service.return_value
         
         # Mock get_current_weather
         service_instance.get_current_weather = AsyncMock()
@@ -54,9 +57,9 @@ def mock_weather_service():
             sources=["openweather", "weatherapi"]
         )
         
-        # Mock get_weather_history
-        service_instance.get_weather_history = AsyncMock()
-        service_instance.get_weather_history.return_value = HistoricalWeather(
+        # Mock get_history
+        service_instance.get_history = AsyncMock()
+        service_instance.get_history.return_value = HistoricalWeather(
             city="Paris",
             historical_data=[
                 ForecastItem(
@@ -78,6 +81,8 @@ def mock_weather_service():
         )
         
         yield service_instance
+    finally:
+        app.dependency_overrides.clear()
 
 def test_get_current_weather_valid_city(test_client, mock_weather_service):
     """Test getting current weather for a valid city"""
@@ -147,10 +152,93 @@ def test_get_history_valid_city(test_client, mock_weather_service):
 def test_get_history_invalid_city(test_client, mock_weather_service):
     """Test getting history for an invalid city"""
     # Configure the mock to return None for invalid city
-    mock_weather_service.get_weather_history.return_value = None
+    mock_weather_service.get_history.return_value = None
     
     response = test_client.get("/api/v1/weather/history/InvalidCity123")
     
     assert response.status_code == 500  # L'API retourne 500 au lieu de 404
     data = response.json()
     assert "detail" in data
+
+@pytest.fixture
+def export_service():
+    """Real WeatherService with a mocked Redis, for the streaming export"""
+    from src.services.weather_service import WeatherService
+    service = WeatherService(redis_service=AsyncMock())
+    app.dependency_overrides[get_weather_service] = lambda: service
+    try:
+        yield service
+    finally:
+        app.dependency_overrides.clear()
+
+def test_export_history_ndjson(test_client, export_service):
+    """Test the history export streams one JSON line per city and day"""
+    with test_client.stream("GET", "/api/v1/weather/history/export?cities=Paris,Atlantis,London&days=3") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [line for line in response.iter_lines() if line]
+    
+    assert len(lines) == 6
+    assert {json.loads(line)["city"] for line in lines} == {"Paris", "London"}
+
+def test_export_history_csv(test_client, export_service):
+    """Test the history export as CSV"""
+    response = test_client.get("/api/v1/weather/history/export?cities=Paris&days=2&format=csv")
+    
+    assert response.status_code == 200
+    rows = response.text.strip().splitlines()
+    assert rows[0].startswith("city,timestamp,temperature")
+    assert len(rows) == 3
+
+def test_get_current_weather_msgpack(test_client, mock_weather_service):
+    """Test the MessagePack representation of current weather"""
+    msgpack = pytest.importorskip("msgpack")
+    response = test_client.get("/api/v1/weather/current/Paris", headers={"Accept": "application/msgpack"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert "Accept" in response.headers["vary"]
+    data = msgpack.unpackb(response.content)
+    assert data == test_client.get("/api/v1/weather/current/Paris").json()
+
+def test_get_forecast_cbor(test_client, mock_weather_service):
+    """Test the CBOR representation of a forecast"""
+    cbor2 = pytest.importorskip("cbor2")
+    response = test_client.get("/api/v1/weather/forecast/Paris?days=2", headers={"Accept": "application/cbor"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/cbor"
+    data = cbor2.loads(response.content)
+    assert len(data["forecast_items"]) == 2
+
+def test_json_preferred_by_default(test_client, mock_weather_service):
+    """Test that JSON is served unless a binary format is preferred"""
+    response = test_client.get(
+        "/api/v1/weather/current/Paris",
+        headers={"Accept": "application/json, application/msgpack;q=0.5"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "Accept" in response.headers["vary"]
+    assert response.json()["city"] == "Paris"
+
+def test_get_current_weather_fields(test_client, mock_weather_service):
+    """Test a field selection trims the response and reaches the service"""
+    response = test_client.get("/api/v1/weather/current/Paris?fields=temperature,humidity")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["temperature"]["current"] == 22.0
+    assert data["humidity"] == 60
+    assert "wind" not in data
+    assert "conditions" not in data
+    assert data["city"] == "Paris"
+    mock_weather_service.get_current_weather.assert_called_once_with("Paris", frozenset({"temperature", "humidity"}))
+
+def test_get_current_weather_unknown_field(test_client, mock_weather_service):
+    """Test an unknown field is rejected"""
+    response = test_client.get("/api/v1/weather/current/Paris?fields=temperature,uv_index")
+    
+    assert response.status_code == 422
+    mock_weather_service.get_current_weather.assert_not_called()
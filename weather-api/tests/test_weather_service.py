@@ -2,6 +2,8 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 from src.services.weather_service import WeatherService
+from src.services.observation import ProviderObservation
+from src.services.provider_registry import BulkheadFull, ProviderRegistry
 from src.schemas.weather import CurrentWeather, Temperature, Wind, WeatherCondition
 from datetime import datetime
 
@@ -27,59 +29,35 @@ def weather_service(mock_redis_service):
     service._get_city_coordinates = MagicMock(return_value={"lat": 48.8566, "lon": 2.3522})
     
     # Configure the mocks to return test data
-    service._get_open_meteo_current.return_value = {
-        "source": "open_meteo",
-        "temperature": {
-            "current": 20.5,
-            "unit": "celsius"
-        },
-        "humidity": 65,
-        "conditions": {
-            "main": "Clouds",
-            "description": "Partly cloudy"
-        },
-        "wind": {
-            "speed": 10.0,
-            "direction": 45.0,
-            "unit": "m/s"
-        }
-    }
-    
-    service._get_openweather_current.return_value = {
-        "source": "openweather",
-        "temperature": {
-            "current": 21.0,
-            "unit": "celsius"
-        },
-        "humidity": 70,
-        "conditions": {
-            "main": "Clouds",
-            "description": "Scattered clouds"
-        },
-        "wind": {
-            "speed": 12.0,
-            "direction": 90.0,
-            "unit": "m/s"
-        }
-    }
-    
-    service._get_weatherapi_current.return_value = {
-        "source": "weatherapi",
-        "temperature": {
-            "current": 20.0,
-            "unit": "celsius"
-        },
-        "humidity": 68,
-        "conditions": {
-            "main": "Clouds",
-            "description": "Partly cloudy"
-        },
-        "wind": {
-            "speed": 11.0,
-            "direction": 60.0,
-            "unit": "m/s"
-        }
-    }
+    service._get_open_meteo_current.return_value = ProviderObservation(
+        source="open_meteo",
+        temperature=20.5,
+        humidity=65,
+        wind_speed=10.0,
+        wind_direction=45.0,
+        condition="Clouds",
+        description="Partly cloudy"
+    )
+    
+    service._get_openweather_current.return_value = ProviderObservation(
+        source="openweather",
+        temperature=21.0,
+        humidity=70,
+        wind_speed=12.0,
+        wind_direction=90.0,
+        condition="Clouds",
+        description="Scattered clouds"
+    )
+    
+    service._get_weatherapi_current.return_value = ProviderObservation(
+        source="weatherapi",
+        temperature=20.0,
+        humidity=68,
+        wind_speed=11.0,
+        wind_direction=60.0,
+        condition="Clouds",
+        description="Partly cloudy"
+    )
     
     return service
 
@@ -199,3 +177,268 @@ async def test_get_current_weather_invalid_city(weather_service):
     
     # Verify the result is None
     assert result is None
+
+@pytest.mark.asyncio
+async def test_get_current_weather_batch(weather_service, mock_redis_service):
+    """Test several cities are fetched and aggregated together"""
+    coordinates = {"paris": {"lat": 48.8566, "lon": 2.3522}, "london": {"lat": 51.5074, "lon": -0.1278}}
+    weather_service._get_city_coordinates = MagicMock(side_effect=lambda city: coordinates.get(city.lower()))
+    
+    results = await weather_service.get_current_weather_batch(["Paris", "Atlantis", "London"])
+    
+    assert results[1] is None
+    assert [r.city for r in results if r] == ["Paris", "London"]
+    assert results[0].temperature.current == pytest.approx((20.5 + 21.0 + 20.0) / 3)
+    assert results[0].wind.speed == pytest.approx(11.0)
+    assert mock_redis_service.set.call_count == 2
+
+@pytest.mark.asyncio
+async def test_get_current_weather_quorum(weather_service, mock_redis_service):
+    """Test the response does not wait for a slow provider once the quorum is reached"""
+    async def slow_weatherapi(city):
+        await asyncio.sleep(0.2)
+        return ProviderObservation(source="weatherapi", temperature=26.0, humidity=68)
+    weather_service._get_weatherapi_current = slow_weatherapi
+    quorum = {"current": {"min_sources": 2, "latency_budget": 0}}
+    
+    with patch.dict("src.services.weather_service.settings.QUORUM_SETTINGS", quorum):
+        result = await weather_service.get_current_weather("Paris")
+        
+        # The early aggregate is returned and cached without the slow provider
+        assert result.sources == ["open_meteo", "openweather"]
+        assert mock_redis_service.set.call_count == 1
+        
+        # The late provider then upgrades the cached aggregate
+        await asyncio.gather(*weather_service._background_tasks)
+    
+    assert mock_redis_service.set.call_count == 2
+    upgraded = CurrentWeather.model_validate_json(mock_redis_service.set.call_args[0][1])
+    assert upgraded.sources == ["open_meteo", "openweather", "weatherapi"]
+
+@pytest.mark.asyncio
+async def test_get_current_weather_latency_budget(weather_service):
+    """Test the latency budget bounds the wait for slow providers"""
+    async def slow_openweather(city):
+        await asyncio.sleep(1)
+    weather_service._get_openweather_current = slow_openweather
+    quorum = {"current": {"min_sources": 0, "latency_budget": 0.05}}
+    
+    with patch.dict("src.services.weather_service.settings.QUORUM_SETTINGS", quorum):
+        result = await weather_service.get_current_weather("Paris")
+    
+    assert result.sources == ["open_meteo", "weatherapi"]
+    await weather_service.close()
+
+@pytest.mark.asyncio
+async def test_full_bulkhead_spends_no_quota(mock_redis_service):
+    """Test a provider call rejected by its bulkhead does not consume a quota token"""
+    quota_manager = MagicMock()
+    quota_manager.acquire = AsyncMock(return_value=True)
+    registry = ProviderRegistry({
+        "open_meteo": {"max_concurrency": 1, "queue_timeout": 0.01, "max_connections": 1},
+        "openweather": {"max_concurrency": 1, "queue_timeout": 0.01, "max_connections": 1},
+        "weatherapi": {"max_concurrency": 1, "queue_timeout": 0.01, "max_connections": 1},
+    })
+    service = WeatherService(redis_service=mock_redis_service, quota_manager=quota_manager, provider_registry=registry)
+    service.openweather_api_key = "key"
+    
+    async with registry.get("openweather").slot():
+        with pytest.raises(BulkheadFull):
+            await service._get_openweather_current("Paris")
+    
+    quota_manager.acquire.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_open_meteo_adapter_reads_current_block(mock_redis_service):
+    """Test the Open-Meteo adapter maps the lean `current` payload"""
+    service = WeatherService(redis_service=mock_redis_service)
+    service.open_meteo_batcher.load = AsyncMock(return_value={
+        "current": {
+            "temperature_2m": 18.4,
+            "relative_humidity_2m": 72,
+            "pressure_msl": 1012.3,
+            "wind_speed_10m": 14.8,
+            "wind_direction_10m": 250,
+            "weather_code": 3
+        }
+    })
+    
+    result = await service._get_open_meteo_current("Paris", {"lat": 48.8566, "lon": 2.3522})
+    
+    assert "current" in service.open_meteo_batcher.params
+    assert "hourly" not in service.open_meteo_batcher.params
+    assert result.temperature == 18.4
+    assert result.humidity == 72
+    assert result.pressure == 1012.3
+    assert result.wind_speed == pytest.approx(14.8 / 3.6)
+    assert result.wind_direction == 250
+    assert result.description == "Overcast"
+
+@pytest.mark.asyncio
+async def test_unknown_city_negative_cached(weather_service, mock_redis_service):
+    """Test an unknown city is answered without Redis on the next request"""
+    weather_service._get_city_coordinates = MagicMock(return_value=None)
+    
+    assert await weather_service.get_current_weather("Atlantis") is None
+    assert await weather_service.get_forecast("Atlantis") is None
+    
+    assert mock_redis_service.get.call_count == 1
+    weather_service._get_city_coordinates.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_failed_aggregation_negative_cached(weather_service):
+    """Test providers are not called again right after they all failed"""
+    for adapter in (
+        weather_service._get_open_meteo_current,
+        weather_service._get_openweather_current,
+        weather_service._get_weatherapi_current
+    ):
+        adapter.side_effect = Exception("API error")
+    
+    assert await weather_service.get_current_weather("Paris") is None
+    assert await weather_service.get_current_weather("Paris") is None
+    
+    weather_service._get_open_meteo_current.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_abandoned_request_cancels_provider_calls(weather_service, mock_redis_service):
+    """Test the provider calls of a cancelled request are cancelled too"""
+    cancelled = asyncio.Event()
+    async def hanging_openweather(city):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    weather_service._get_openweather_current = hanging_openweather
+    
+    request = asyncio.create_task(weather_service.get_current_weather("Paris"))
+    await asyncio.sleep(0.01)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+    
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    mock_redis_service.set.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_abandoned_request_completes_for_cache(weather_service, mock_redis_service):
+    """Test in-flight provider calls can finish to fill the cache when configured"""
+    async def slow_openweather(city):
+        await asyncio.sleep(0.05)
+        return ProviderObservation(source="openweather", temperature=21.0)
+    weather_service._get_openweather_current = slow_openweather
+    
+    with patch("src.services.weather_service.settings.COMPLETE_ABANDONED_FETCHES", True):
+        request = asyncio.create_task(weather_service.get_current_weather("Paris"))
+        await asyncio.sleep(0.01)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+    
+    await asyncio.gather(*weather_service._background_tasks)
+    cached = CurrentWeather.model_validate_json(mock_redis_service.set.call_args[0][1])
+    assert sorted(cached.sources) == ["open_meteo", "openweather", "weatherapi"]
+
+@pytest.mark.asyncio
+async def test_cache_metrics(weather_service, mock_redis_service):
+    """Test cache hits, misses and decode errors are counted by data type"""
+    from prometheus_client import REGISTRY
+    def sample(name):
+        return REGISTRY.get_sample_value(name, {"data_type": "forecast"}) or 0
+    before = {name: sample(name) for name in ("cache_hits_total", "cache_misses_total", "cache_decode_errors_total")}
+    
+    forecast = await weather_service.get_forecast("Paris", 2)
+    mock_redis_service.get.return_value = forecast.model_dump_json()
+    await weather_service.get_forecast("Paris", 2)
+    mock_redis_service.get.return_value = "not json"
+    await weather_service.get_forecast("Paris", 2)
+    
+    assert sample("cache_misses_total") - before["cache_misses_total"] == 2
+    assert sample("cache_hits_total") - before["cache_hits_total"] == 1
+    assert sample("cache_decode_errors_total") - before["cache_decode_errors_total"] == 1
+
+@pytest.mark.asyncio
+async def test_stale_only_serves_expired_entry(weather_service, mock_redis_service):
+    """Test providers are not called while shedding load"""
+    from src.services.load_shedding import Overloaded, reset_stale_only, set_stale_only
+    stale = CurrentWeather(city="Paris", temperature=Temperature(current=18.0), sources=["open_meteo"])
+    mock_redis_service.get_stale = AsyncMock(return_value=stale.model_dump_json())
+    
+    token = set_stale_only(True)
+    try:
+        result = await weather_service.get_current_weather("Paris")
+        mock_redis_service.get_stale.return_value = None
+        with pytest.raises(Overloaded):
+            await weather_service.get_current_weather("London")
+    finally:
+        reset_stale_only(token)
+    
+    assert result.temperature.current == 18.0
+    weather_service._get_open_meteo_current.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_stale_only_unknown_city_not_overloaded(weather_service, mock_redis_service):
+    """Test an unknown city is reported as unknown while shedding load, not as a retryable overload"""
+    from src.services.load_shedding import reset_stale_only, set_stale_only
+    weather_service._get_city_coordinates.return_value = None
+    mock_redis_service.get_stale = AsyncMock(return_value=None)
+    
+    token = set_stale_only(True)
+    try:
+        assert await weather_service.get_current_weather("Atlantis") is None
+        assert await weather_service.get_forecast("Atlantis", 2) is None
+    finally:
+        reset_stale_only(token)
+    
+    mock_redis_service.get_stale.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_field_selection_calls_open_meteo_only(weather_service, mock_redis_service):
+    """Test a field subset is served by Open-Meteo alone, under its own cache key"""
+    result = await weather_service.get_current_weather("Paris", frozenset({"temperature"}))
+    
+    assert result.temperature.current == 20.5
+    assert result.sources == ["open_meteo"]
+    weather_service._get_openweather_current.assert_not_called()
+    weather_service._get_weatherapi_current.assert_not_called()
+    # The full aggregate is looked up first, then the entry of the plan
+    assert [call.args[0] for call in mock_redis_service.get.call_args_list] == [
+        "weather:current:paris",
+        "weather:current:paris:open_meteo",
+    ]
+    assert mock_redis_service.set.call_args.args[0] == "weather:current:paris:open_meteo"
+
+@pytest.mark.asyncio
+async def test_field_selection_reuses_full_aggregate(weather_service, mock_redis_service):
+    """Test a cached full aggregate serves field subsets without provider calls"""
+    cached = CurrentWeather(
+        city="Paris",
+        temperature=Temperature(current=20.5, unit="celsius"),
+        humidity=67,
+        sources=["open_meteo", "openweather", "weatherapi"]
+    )
+    mock_redis_service.get.side_effect = lambda key: cached.model_dump_json() if key == "weather:current:paris" else None
+    
+    result = await weather_service.get_current_weather("Paris", frozenset({"humidity"}))
+    
+    assert result.humidity == 67
+    weather_service._get_open_meteo_current.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_forecast_cached_once_at_max_horizon(weather_service, mock_redis_service):
+    """Test every days value is a slice of one full-horizon cache entry"""
+    from config.settings import settings
+    
+    forecast = await weather_service.get_forecast("Paris", 3)
+    
+    assert len(forecast.forecast_items) == 3
+    key, value = mock_redis_service.set.call_args.args[:2]
+    assert key == "weather:forecast:paris"
+    mock_redis_service.get.side_effect = lambda k: value if k == "weather:forecast:paris" else None
+    
+    assert len((await weather_service.get_forecast("Paris", 7)).forecast_items) == 7
+    full = await weather_service.get_forecast("Paris", settings.FORECAST_MAX_DAYS)
+    assert len(full.forecast_items) == settings.FORECAST_MAX_DAYS
+    assert full.forecast_items[:3] == forecast.forecast_items
+    assert mock_redis_service.set.call_count == 1